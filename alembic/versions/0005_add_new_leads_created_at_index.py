@@ -0,0 +1,32 @@
+"""add partial index for new leads
+
+Revision ID: 0005_new_leads_index
+Revises: 0004_notification_outbox
+Create Date: 2026-10-18 11:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_new_leads_index"
+down_revision: Union[str, Sequence[str], None] = "0004_notification_outbox"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_leads_new_created_at",
+        "leads",
+        ["created_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'new'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_leads_new_created_at", table_name="leads")
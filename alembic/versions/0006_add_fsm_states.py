@@ -0,0 +1,39 @@
+"""add fsm states
+
+Revision ID: 0006_fsm_states
+Revises: 0005_new_leads_index
+Create Date: 2026-10-18 12:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_fsm_states"
+down_revision: Union[str, Sequence[str], None] = "0005_new_leads_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence("fsm_state_version_seq")))
+    op.create_table(
+        "fsm_states",
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("state", sa.String(length=255), nullable=True),
+        sa.Column("data", postgresql.JSONB(), server_default=sa.text("'{}'::jsonb"), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index("ix_fsm_states_updated_at", "fsm_states", ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_fsm_states_updated_at", table_name="fsm_states")
+    op.drop_table("fsm_states")
+    op.execute(sa.schema.DropSequence(sa.Sequence("fsm_state_version_seq")))
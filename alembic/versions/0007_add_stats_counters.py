@@ -0,0 +1,47 @@
+"""add stats counters
+
+Revision ID: 0007_stats_counters
+Revises: 0006_fsm_states
+Create Date: 2026-10-18 13:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_stats_counters"
+down_revision: Union[str, Sequence[str], None] = "0006_fsm_states"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stats_counters",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("users_count", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("leads_total", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("leads_new", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("leads_completed", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute(
+        """
+        INSERT INTO stats_counters (id, users_count, leads_total, leads_new, leads_completed)
+        SELECT
+            1,
+            (SELECT count(*) FROM users),
+            count(*),
+            count(*) FILTER (WHERE status = 'new'),
+            count(*) FILTER (WHERE status = 'completed')
+        FROM leads
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("stats_counters")
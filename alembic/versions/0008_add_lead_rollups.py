@@ -0,0 +1,59 @@
+"""add lead rollups
+
+Revision ID: 0008_lead_rollups
+Revises: 0007_stats_counters
+Create Date: 2026-10-18 14:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_lead_rollups"
+down_revision: Union[str, Sequence[str], None] = "0007_stats_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("leads", sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True))
+    op.create_table(
+        "lead_rollups",
+        sa.Column("period", sa.String(length=4), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("leads_created", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("leads_completed", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("completion_seconds", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("reminders_sent", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.PrimaryKeyConstraint("period", "bucket_start"),
+    )
+    op.create_table(
+        "lead_completion_times",
+        sa.Column("day", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("bucket", sa.SmallInteger(), nullable=False),
+        sa.Column("count", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.PrimaryKeyConstraint("day", "bucket"),
+    )
+    op.create_table(
+        "lead_rollup_backfill",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("last_lead_id", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("max_lead_id", sa.BigInteger(), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # Leads up to this id existed before rollups were maintained; the backfill job folds them in.
+    op.execute(
+        "INSERT INTO lead_rollup_backfill (id, max_lead_id) SELECT 1, coalesce(max(id), 0) FROM leads"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("lead_rollup_backfill")
+    op.drop_table("lead_completion_times")
+    op.drop_table("lead_rollups")
+    op.drop_column("leads", "completed_at")
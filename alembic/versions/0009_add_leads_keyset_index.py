@@ -0,0 +1,41 @@
+"""add leads keyset index
+
+Revision ID: 0009_leads_keyset_index
+Revises: 0008_lead_rollups
+Create Date: 2026-10-18 15:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_leads_keyset_index"
+down_revision: Union[str, Sequence[str], None] = "0008_lead_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves every (status, created_at, id) keyset page in both directions and
+    # the reminder scan, so the partial index on new leads is no longer needed.
+    op.create_index(
+        "ix_leads_status_created_at_id",
+        "leads",
+        ["status", "created_at", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_leads_new_created_at", table_name="leads")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_leads_new_created_at",
+        "leads",
+        ["created_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'new'"),
+    )
+    op.drop_index("ix_leads_status_created_at_id", table_name="leads")
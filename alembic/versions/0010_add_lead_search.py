@@ -0,0 +1,59 @@
+"""add lead search
+
+Revision ID: 0010_lead_search
+Revises: 0009_leads_keyset_index
+Create Date: 2026-10-18 16:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_lead_search"
+down_revision: Union[str, Sequence[str], None] = "0009_leads_keyset_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column("leads", sa.Column("phone_normalized", sa.String(length=50), nullable=True))
+    # Same rules as app.utils.logic.normalize_phone.
+    op.execute(
+        r"""
+        UPDATE leads
+        SET phone_normalized = regexp_replace(translate(btrim(phone, E' \t\n\r\f'), ' -()', ''), '^([^+])', '+\1')
+        """
+    )
+    op.create_index(
+        "ix_leads_phone_normalized_created_at",
+        "leads",
+        ["phone_normalized", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_leads_name_trgm",
+        "leads",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_leads_service_trgm",
+        "leads",
+        ["service"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"service": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_leads_service_trgm", table_name="leads")
+    op.drop_index("ix_leads_name_trgm", table_name="leads")
+    op.drop_index("ix_leads_phone_normalized_created_at", table_name="leads")
+    op.drop_column("leads", "phone_normalized")
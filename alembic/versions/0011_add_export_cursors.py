@@ -0,0 +1,32 @@
+"""add export cursors
+
+Revision ID: 0011_export_cursors
+Revises: 0010_lead_search
+Create Date: 2026-10-18 17:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_export_cursors"
+down_revision: Union[str, Sequence[str], None] = "0010_lead_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "export_cursors",
+        sa.Column("name", sa.String(length=64), nullable=False),
+        sa.Column("last_lead_id", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("export_cursors")
@@ -0,0 +1,46 @@
+"""add leads archive
+
+Revision ID: 0012_leads_archive
+Revises: 0011_export_cursors
+Create Date: 2026-10-18 18:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0012_leads_archive"
+down_revision: Union[str, Sequence[str], None] = "0011_export_cursors"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "leads_archive",
+        sa.Column("id", sa.BigInteger(), autoincrement=False, nullable=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("phone", sa.String(length=50), nullable=False),
+        sa.Column("phone_normalized", sa.String(length=50), nullable=True),
+        sa.Column("service", sa.String(length=255), nullable=True),
+        sa.Column("comment", sa.Text(), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_reminder_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("reminder_count", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_leads_archive_user_id", "leads_archive", ["user_id"], unique=False)
+    op.create_index("ix_leads_archive_created_at", "leads_archive", ["created_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_leads_archive_created_at", table_name="leads_archive")
+    op.drop_index("ix_leads_archive_user_id", table_name="leads_archive")
+    op.drop_table("leads_archive")
@@ -0,0 +1,48 @@
+"""add leads archive search indexes
+
+Revision ID: 0013_leads_archive_search
+Revises: 0012_leads_archive
+Create Date: 2026-10-19 10:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0013_leads_archive_search"
+down_revision: Union[str, Sequence[str], None] = "0012_leads_archive"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_leads_archive_phone_normalized_created_at",
+        "leads_archive",
+        ["phone_normalized", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_leads_archive_name_trgm",
+        "leads_archive",
+        ["name"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_leads_archive_service_trgm",
+        "leads_archive",
+        ["service"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"service": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_leads_archive_service_trgm", table_name="leads_archive")
+    op.drop_index("ix_leads_archive_name_trgm", table_name="leads_archive")
+    op.drop_index("ix_leads_archive_phone_normalized_created_at", table_name="leads_archive")
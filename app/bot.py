@@ -2,7 +2,25 @@ from aiogram import Bot, Dispatcher
 
 from app.config import settings
 from app.handlers import router as root_router
+from app.middlewares.flood import FloodControlMiddleware, setup_flood_control
+from app.middlewares.metrics import setup_metrics_middlewares
+from app.services.bot_session import build_bot_session
+from app.services.fsm_storage import build_fsm_storage
 
-bot = Bot(token=settings.bot_token)
-dp = Dispatcher()
+bot = Bot(token=settings.bot_token, session=build_bot_session(settings.bot_api))
+# FSM context is registered by setup_flood_control so that throttled updates
+# never read their state from storage.
+dp = Dispatcher(storage=build_fsm_storage(), disable_fsm=settings.flood.enabled)
+if settings.flood.enabled:
+    setup_flood_control(
+        dp,
+        FloodControlMiddleware(
+            settings.flood.limits,
+            action=settings.flood.action,
+            max_delay=settings.flood.max_delay,
+            exempt_user_ids=(settings.admin_id,),
+            cache_size=settings.flood.cache_size,
+        ),
+    )
 dp.include_router(root_router)
+setup_metrics_middlewares(dp, bot)
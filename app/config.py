@@ -1,20 +1,21 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-from dotenv import load_dotenv
-
-load_dotenv()
+from app.env import (  # noqa: F401
+    PoolSettings,
+    _env_bool,
+    _env_choice,
+    _env_float,
+    _env_float_map,
+    _env_int,
+    _env_rate_limits,
+    _require_env,
+    load_pool_settings,
+)
 
 REQUIRED_ENV_VARS = ("BOT_TOKEN", "ADMIN_ID", "DATABASE_URL", "HOST_URL", "WEBHOOK_SECRET")
 
 
-def _require_env(name: str) -> str:
-    value = os.getenv(name, "").strip()
-    if not value:
-        raise RuntimeError(f"Environment variable {name} is required in .env")
-    return value
-
-
 def _parse_admin_id(raw: str) -> int:
     try:
         return int(raw)
@@ -22,6 +23,59 @@ def _parse_admin_id(raw: str) -> int:
         raise RuntimeError("ADMIN_ID must be an integer") from exc
 
 
+@dataclass(frozen=True)
+class BotApiSettings:
+    # Empty means api.telegram.org; set it to use a local Bot API server or a stand-in.
+    base_url: str = ""
+    local: bool = False
+    connection_limit: int = 100
+    timeout: float = 60.0
+    # Bot API method name -> timeout in seconds, overriding ``timeout``.
+    method_timeouts: dict[str, float] = field(default_factory=dict)
+    keepalive_timeout: float = 60.0
+    dns_cache_ttl: int = 300
+    # Extra attempts for idempotent methods after network and 5xx errors.
+    retries: int = 2
+    retry_backoff: float = 0.5
+
+
+def load_bot_api_settings() -> BotApiSettings:
+    return BotApiSettings(
+        base_url=os.getenv("BOT_API_BASE_URL", "").strip(),
+        local=_env_bool("BOT_API_LOCAL", False),
+        connection_limit=_env_int("BOT_API_CONNECTION_LIMIT", 100),
+        timeout=_env_float("BOT_API_TIMEOUT", 60.0),
+        method_timeouts=_env_float_map("BOT_API_METHOD_TIMEOUTS"),
+        keepalive_timeout=_env_float("BOT_API_KEEPALIVE_SECONDS", 60.0),
+        dns_cache_ttl=_env_int("BOT_API_DNS_CACHE_SECONDS", 300),
+        retries=_env_int("BOT_API_RETRIES", 2),
+        retry_backoff=_env_float("BOT_API_RETRY_BACKOFF_SECONDS", 0.5),
+    )
+
+
+@dataclass(frozen=True)
+class FloodSettings:
+    enabled: bool = True
+    # Command name (without "/"), "callback", "text" or "default" -> (tokens per second, burst).
+    limits: dict[str, tuple[float, float]] = field(default_factory=lambda: {"default": (3.0, 10.0)})
+    # "drop" ignores excess updates; "delay" holds them up to max_delay seconds first.
+    action: str = "drop"
+    max_delay: float = 2.0
+    cache_size: int = 10000
+
+
+def load_flood_settings() -> FloodSettings:
+    limits = _env_rate_limits("FLOOD_LIMITS", "default=3:10")
+    limits.setdefault("default", (3.0, 10.0))
+    return FloodSettings(
+        enabled=_env_bool("FLOOD_CONTROL", True),
+        limits=limits,
+        action=_env_choice("FLOOD_ACTION", "drop", ("drop", "delay")),
+        max_delay=_env_float("FLOOD_MAX_DELAY_SECONDS", 2.0),
+        cache_size=_env_int("FLOOD_CACHE_SIZE", 10000),
+    )
+
+
 @dataclass(frozen=True)
 class Settings:
     bot_token: str
@@ -29,6 +83,41 @@ class Settings:
     database_url: str
     host_url: str
     webhook_secret: str
+    update_queue_workers: int = 0
+    update_queue_maxsize: int = 1000
+    update_queue_drain_timeout: float = 10.0
+    webhook_reply: bool = False
+    dedup_window_size: int = 10000
+    dedup_batch_max_size: int = 0
+    dedup_batch_max_delay_ms: float = 5.0
+    processed_updates_retention_hours: int = 168
+    processed_updates_purge_batch: int = 1000
+    processed_updates_purge_interval_minutes: int = 60
+    known_user_cache_size: int = 10000
+    outbox_batch_size: int = 50
+    outbox_global_rate: float = 30.0
+    outbox_per_chat_rate: float = 1.0
+    outbox_max_attempts: int = 10
+    outbox_retention_days: int = 30
+    reminder_digest: bool = False
+    reminder_resync_minutes: int = 30
+    leader_retry_seconds: float = 10.0
+    fsm_storage: str = "postgres"
+    fsm_cache_size: int = 10000
+    fsm_cache_ttl: float = 1.0
+    fsm_state_ttl_hours: int = 72
+    stats_cache_ttl: float = 5.0
+    rollup_backfill_batch: int = 5000
+    duplicate_window_hours: int = 72
+    export_token: str = ""
+    archive_after_days: int = 90
+    archive_batch_size: int = 1000
+    pool: PoolSettings = field(default_factory=PoolSettings)
+    database_replica_url: str = ""
+    replica_max_lag_seconds: float = 10.0
+    replica_check_interval: float = 5.0
+    bot_api: BotApiSettings = field(default_factory=BotApiSettings)
+    flood: FloodSettings = field(default_factory=FloodSettings)
 
 
 def load_settings() -> Settings:
@@ -39,6 +128,41 @@ def load_settings() -> Settings:
         database_url=values["DATABASE_URL"],
         host_url=values["HOST_URL"].rstrip("/"),
         webhook_secret=values["WEBHOOK_SECRET"],
+        update_queue_workers=_env_int("UPDATE_QUEUE_WORKERS", 0),
+        update_queue_maxsize=_env_int("UPDATE_QUEUE_MAXSIZE", 1000),
+        update_queue_drain_timeout=_env_float("UPDATE_QUEUE_DRAIN_TIMEOUT", 10.0),
+        webhook_reply=_env_bool("WEBHOOK_REPLY", False),
+        dedup_window_size=_env_int("DEDUP_WINDOW_SIZE", 10000),
+        dedup_batch_max_size=_env_int("DEDUP_BATCH_MAX_SIZE", 0),
+        dedup_batch_max_delay_ms=_env_float("DEDUP_BATCH_MAX_DELAY_MS", 5.0),
+        processed_updates_retention_hours=_env_int("PROCESSED_UPDATES_RETENTION_HOURS", 168),
+        processed_updates_purge_batch=_env_int("PROCESSED_UPDATES_PURGE_BATCH", 1000),
+        processed_updates_purge_interval_minutes=_env_int("PROCESSED_UPDATES_PURGE_INTERVAL_MINUTES", 60),
+        known_user_cache_size=_env_int("KNOWN_USER_CACHE_SIZE", 10000),
+        outbox_batch_size=_env_int("OUTBOX_BATCH_SIZE", 50),
+        outbox_global_rate=_env_float("OUTBOX_GLOBAL_RATE", 30.0),
+        outbox_per_chat_rate=_env_float("OUTBOX_PER_CHAT_RATE", 1.0),
+        outbox_max_attempts=_env_int("OUTBOX_MAX_ATTEMPTS", 10),
+        outbox_retention_days=_env_int("OUTBOX_RETENTION_DAYS", 30),
+        reminder_digest=_env_bool("REMINDER_DIGEST", False),
+        reminder_resync_minutes=_env_int("REMINDER_RESYNC_MINUTES", 30),
+        leader_retry_seconds=_env_float("LEADER_RETRY_SECONDS", 10.0),
+        fsm_storage=_env_choice("FSM_STORAGE", "postgres", ("postgres", "memory")),
+        fsm_cache_size=_env_int("FSM_CACHE_SIZE", 10000),
+        fsm_cache_ttl=_env_float("FSM_CACHE_TTL_SECONDS", 1.0),
+        fsm_state_ttl_hours=_env_int("FSM_STATE_TTL_HOURS", 72),
+        stats_cache_ttl=_env_float("STATS_CACHE_TTL_SECONDS", 5.0),
+        rollup_backfill_batch=_env_int("ROLLUP_BACKFILL_BATCH_SIZE", 5000),
+        duplicate_window_hours=_env_int("DUPLICATE_LEAD_WINDOW_HOURS", 72),
+        export_token=os.getenv("EXPORT_TOKEN", "").strip(),
+        archive_after_days=_env_int("ARCHIVE_AFTER_DAYS", 90),
+        archive_batch_size=_env_int("ARCHIVE_BATCH_SIZE", 1000),
+        pool=load_pool_settings(),
+        database_replica_url=os.getenv("DATABASE_REPLICA_URL", "").strip(),
+        replica_max_lag_seconds=_env_float("REPLICA_MAX_LAG_SECONDS", 10.0),
+        replica_check_interval=_env_float("REPLICA_CHECK_INTERVAL_SECONDS", 5.0),
+        bot_api=load_bot_api_settings(),
+        flood=load_flood_settings(),
     )
 
 
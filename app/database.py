@@ -1,15 +1,39 @@
 import os
+import time
+from contextlib import AsyncExitStack
 from pathlib import Path
 from typing import AsyncGenerator
+from uuid import uuid4
 
 from dotenv import load_dotenv
 from alembic import command
 from alembic.config import Config
+from sqlalchemy import event, exc, text
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+from app.env import PoolSettings, load_pool_settings
+from app.services.metrics import Counter, Gauge, Histogram
 
 load_dotenv()
 
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection, including opening a new one.",
+)
+POOL_IN_USE = Gauge("db_pool_connections_in_use", "Connections currently checked out of the pool.")
+POOL_OVERFLOW = Gauge("db_pool_overflow_connections", "Connections open beyond the configured pool size.")
+POOL_OVERFLOW_CHECKOUTS = Counter(
+    "db_pool_overflow_checkouts_total",
+    "Checkouts that had to open a connection beyond the pool size.",
+)
+POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkouts that gave up waiting for a connection.")
+POOL_CONNECTIONS_OPENED = Counter("db_pool_connections_opened_total", "Database connections opened by the pool.")
+DB_QUERY_LATENCY = Histogram("db_query_seconds", "Database statement latency by database and operation.", ["database", "operation"])
+
+_QUERY_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
 
 def _normalize_database_url(url: str) -> str:
     if url.startswith("postgresql://"):
@@ -33,27 +57,147 @@ def build_database_url() -> str:
     return f"postgresql+asyncpg://{user}:{password}@{host}:{port}/{db_name}"
 
 DATABASE_URL = build_database_url()
+_replica_url = os.getenv("DATABASE_REPLICA_URL", "").strip()
+DATABASE_REPLICA_URL = _normalize_database_url(_replica_url) if _replica_url else None
+_leader_url = os.getenv("LEADER_DATABASE_URL", "").strip()
+LEADER_DATABASE_URL = _normalize_database_url(_leader_url) if _leader_url else None
+# Read here rather than from app.config.settings so alembic does not need the bot's secrets.
+POOL_SETTINGS = load_pool_settings()
 ALEMBIC_INI_PATH = Path(__file__).resolve().parent.parent / "alembic.ini"
 
 class Base(DeclarativeBase):
     pass
 
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records checkout wait time, overflow and timeouts.
+
+    Pool events fire only once a connection is handed out, so the waiting
+    itself is measured around ``_do_get``.
+    """
+
+    def _do_get(self):
+        overflow = self.overflow()
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+        if self.overflow() > max(overflow, 0):
+            POOL_OVERFLOW_CHECKOUTS.inc()
+        return record
+
+def _connect_args(pool: PoolSettings) -> dict:
+    if pool.pgbouncer:
+        # PgBouncer may hand every transaction a different server connection,
+        # so prepared statements must be neither cached nor reused by name.
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return {"prepared_statement_cache_size": pool.statement_cache_size}
+
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,
+    poolclass=InstrumentedQueuePool,
+    pool_size=POOL_SETTINGS.size,
+    max_overflow=POOL_SETTINGS.max_overflow,
+    pool_timeout=POOL_SETTINGS.timeout,
+    pool_recycle=POOL_SETTINGS.recycle,
+    pool_pre_ping=POOL_SETTINGS.pre_ping,
+    connect_args=_connect_args(POOL_SETTINGS),
 )
 
+POOL_IN_USE.set_function(lambda: engine.pool.checkedout())
+POOL_OVERFLOW.set_function(lambda: max(engine.pool.overflow(), 0))
+
+@event.listens_for(engine.sync_engine, "connect")
+def _count_connection(dbapi_connection, connection_record) -> None:
+    POOL_CONNECTIONS_OPENED.inc()
+
+def _query_operation(statement: str) -> str:
+    head = statement[:32].lstrip()[:6].upper()
+    for operation in _QUERY_OPERATIONS:
+        if head.startswith(operation):
+            return operation.lower()
+    return "other"
+
+def instrument_queries(sync_engine, database: str) -> None:
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        # Kept on the execution context: after_cursor_execute never runs for a
+        # failed statement, so anything stored on the connection would leak.
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        DB_QUERY_LATENCY.labels(database, _query_operation(statement)).observe(
+            time.perf_counter() - context._query_started
+        )
+
+instrument_queries(engine.sync_engine, "primary")
+
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
 
+# Read-only traffic that tolerates replication lag; see app.services.replica.read_session.
+replica_engine = (
+    create_async_engine(
+        DATABASE_REPLICA_URL,
+        echo=False,
+        pool_size=POOL_SETTINGS.size,
+        max_overflow=POOL_SETTINGS.max_overflow,
+        pool_timeout=POOL_SETTINGS.timeout,
+        pool_recycle=POOL_SETTINGS.recycle,
+        pool_pre_ping=POOL_SETTINGS.pre_ping,
+        connect_args=_connect_args(POOL_SETTINGS),
+    )
+    if DATABASE_REPLICA_URL
+    else None
+)
+
+if replica_engine is not None:
+    instrument_queries(replica_engine.sync_engine, "replica")
+
+ReplicaSessionLocal = (
+    async_sessionmaker(bind=replica_engine, class_=AsyncSession, expire_on_commit=False)
+    if replica_engine is not None
+    else None
+)
+
+def create_leader_engine() -> AsyncEngine:
+    """Unpooled engine for leader election, whose session lock must stay on one server backend.
+
+    The lock connection lives as long as the process leads, so it is kept out
+    of the application pool. Through a transaction-pooling PgBouncer the lock
+    and the heartbeat could run on different backends, so LEADER_DATABASE_URL
+    must then point at Postgres directly.
+    """
+    if LEADER_DATABASE_URL is None and POOL_SETTINGS.pgbouncer:
+        raise RuntimeError("LEADER_DATABASE_URL (a direct Postgres connection) is required when DB_PGBOUNCER=true")
+    return create_async_engine(LEADER_DATABASE_URL or DATABASE_URL, echo=False, poolclass=NullPool)
+
+
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
 
 
+async def warm_up_pool(connections: int) -> None:
+    """Open ``connections`` pooled connections at once so they are ready for traffic."""
+    async with AsyncExitStack() as stack:
+        for _ in range(connections):
+            connection = await stack.enter_async_context(engine.connect())
+            await connection.execute(text("SELECT 1"))
+
+
 def run_migrations() -> None:
     config = Config(str(ALEMBIC_INI_PATH))
     config.set_main_option("sqlalchemy.url", DATABASE_URL)
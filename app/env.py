@@ -0,0 +1,117 @@
+# Environment parsing shared by app.config and app.database. Importing this
+# module never requires the bot's secrets, so alembic can load app.database
+# with nothing but the database settings.
+import os
+from dataclasses import dataclass
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _require_env(name: str) -> str:
+    value = os.getenv(name, "").strip()
+    if not value:
+        raise RuntimeError(f"Environment variable {name} is required in .env")
+    return value
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError as exc:
+        raise RuntimeError(f"{name} must be an integer") from exc
+
+
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError as exc:
+        raise RuntimeError(f"{name} must be a number") from exc
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.getenv(name, "").strip().lower()
+    if not raw:
+        return default
+    if raw in {"1", "true", "yes", "on"}:
+        return True
+    if raw in {"0", "false", "no", "off"}:
+        return False
+    raise RuntimeError(f"{name} must be a boolean")
+
+
+def _env_choice(name: str, default: str, choices: tuple[str, ...]) -> str:
+    value = os.getenv(name, "").strip().lower() or default
+    if value not in choices:
+        raise RuntimeError(f"{name} must be one of: {', '.join(choices)}")
+    return value
+
+
+def _env_float_map(name: str) -> dict[str, float]:
+    """Parse ``key=number`` pairs separated by commas, e.g. ``sendMessage=10,getMe=5``."""
+    values: dict[str, float] = {}
+    for item in os.getenv(name, "").split(","):
+        if not item.strip():
+            continue
+        key, separator, raw = item.partition("=")
+        if not separator or not key.strip():
+            raise RuntimeError(f"{name} must be a comma-separated list of key=number pairs")
+        try:
+            values[key.strip()] = float(raw)
+        except ValueError as exc:
+            raise RuntimeError(f"{name} must be a comma-separated list of key=number pairs") from exc
+    return values
+
+
+def _env_rate_limits(name: str, default: str) -> dict[str, tuple[float, float]]:
+    """Parse ``group=rate:burst`` pairs, e.g. ``default=3:10,start=0.2:2``."""
+    limits: dict[str, tuple[float, float]] = {}
+    for item in (os.getenv(name, "").strip() or default).split(","):
+        if not item.strip():
+            continue
+        key, _, raw = item.partition("=")
+        rate, _, burst = raw.partition(":")
+        try:
+            limit = (float(rate), float(burst))
+        except ValueError as exc:
+            raise RuntimeError(f"{name} must be a comma-separated list of group=rate:burst pairs") from exc
+        if not key.strip() or limit[0] <= 0 or limit[1] < 1:
+            raise RuntimeError(f"{name} needs a group name, a positive rate and a burst of at least 1")
+        limits[key.strip().lower()] = limit
+    return limits
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    size: int = 5
+    max_overflow: int = 10
+    timeout: float = 30.0
+    # Seconds after which a connection is replaced; -1 keeps connections forever.
+    recycle: int = -1
+    pre_ping: bool = False
+    # Transaction-pooling PgBouncer: no server-side prepared statement caching.
+    pgbouncer: bool = False
+    statement_cache_size: int = 100
+    # Connections opened during startup so the first requests do not pay for them.
+    warmup: int = 5
+
+
+def load_pool_settings() -> PoolSettings:
+    size = _env_int("DB_POOL_SIZE", 5)
+    return PoolSettings(
+        size=size,
+        max_overflow=_env_int("DB_MAX_OVERFLOW", 10),
+        timeout=_env_float("DB_POOL_TIMEOUT", 30.0),
+        recycle=_env_int("DB_POOL_RECYCLE", -1),
+        pre_ping=_env_bool("DB_POOL_PRE_PING", False),
+        pgbouncer=_env_bool("DB_PGBOUNCER", False),
+        statement_cache_size=_env_int("DB_STATEMENT_CACHE_SIZE", 100),
+        warmup=min(_env_int("DB_POOL_WARMUP", size), size),
+    )
@@ -1,62 +1,74 @@
+import re
 from datetime import UTC, datetime, timedelta
 
-from aiogram import Bot, F, Router
-from aiogram.filters import Command
+from aiogram import F, Router
+from aiogram.enums import ParseMode
+from aiogram.filters import Command, CommandObject
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
-from sqlalchemy import case, func, or_, select
 
 from app.config import settings
-from app.database import AsyncSessionLocal
 from app.models.lead import Lead
-from app.models.user import User
-from app.utils.logic import parse_lead_id_from_callback
+from app.services.export import LeadExport, StreamingInputFile
+from app.services.leads import (
+    LEAD_VIEWS,
+    LeadPage,
+    complete_leads,
+    complete_leads_between,
+    complete_leads_older_than,
+    fetch_lead_page,
+    find_leads,
+)
+from app.services.rollups import get_lead_trend
+from app.services.stats import StatsSnapshot, get_stats, reconcile_stats
+from app.utils.export import parse_export_args
+from app.utils.logic import (
+    build_page_callback,
+    build_page_range_callback,
+    parse_lead_id_from_callback,
+    parse_page_callback,
+    parse_page_range_callback,
+    time_ago_text,
+)
+from app.utils.rollups import completion_bucket_text
 
 router = Router()
-STALE_AFTER_HOURS = 1
-REMINDER_REPEAT_HOURS = 3
 
+LEADS_PAGE_SIZE = 10
+FIND_LIMIT = 10
+# Shorter name/service queries cannot use the trigram indexes.
+FIND_MIN_LENGTH = 3
 
-def _is_admin(user_id: int | None) -> bool:
-    return bool(user_id) and user_id == settings.admin_id
-
+# /stats argument -> (rollup period, number of buckets, bucket label format, title)
+TREND_VIEWS = {
+    "day": ("hour", 24, "%H:%M", "Заявки за сутки (UTC):"),
+    "week": ("day", 7, "%d.%m", "Заявки за неделю (UTC):"),
+}
 
-def _time_ago_text(created_at: datetime) -> str:
-    now = datetime.now(UTC)
-    dt = created_at if created_at.tzinfo else created_at.replace(tzinfo=UTC)
-    delta = now - dt
 
-    minutes = int(delta.total_seconds() // 60)
-    if minutes < 1:
-        return "только что"
-    if minutes < 60:
-        return f"{minutes} мин назад"
+# First line of a lead in /leads, /leads_new and /find messages: "3. #42 Anna +7999 (5 мин назад)".
+_LEAD_LINE_RE = re.compile(r"^\d+\. #(\d+) ")
+_STATUS_COMPLETED_LINE = "   Статус: Завершена"
+_ALERT_COMPLETED_TEXT = "\n\n<b>Status:</b> Completed"
 
-    hours = minutes // 60
-    if hours < 24:
-        return f"{hours} ч назад"
 
-    days = hours // 24
-    return f"{days} дн назад"
+def _is_admin(user_id: int | None) -> bool:
+    return bool(user_id) and user_id == settings.admin_id
 
 
 def _format_lead_line(index: int, lead: Lead) -> str:
-    age = _time_ago_text(lead.created_at)
+    age = time_ago_text(lead.created_at)
     stale = datetime.now(UTC) - (
         lead.created_at if lead.created_at.tzinfo else lead.created_at.replace(tzinfo=UTC)
     ) > timedelta(hours=3)
     warning = " [STALE]" if stale else ""
     service_text = lead.service.strip() if lead.service and lead.service.strip() else "Не указана"
     return (
-        f"{index}. {lead.name} {lead.phone} ({age}){warning}\n"
+        f"{index}. #{lead.id} {lead.name} {lead.phone} ({age}){warning}\n"
         f"   Service: {service_text}"
     )
 
 
-def _build_leads_keyboard(leads: list[Lead]) -> InlineKeyboardMarkup | None:
-    new_leads = [lead for lead in leads if lead.status == "new"]
-    if not new_leads:
-        return None
-
+def _build_leads_keyboard(view: str, page: LeadPage) -> InlineKeyboardMarkup | None:
     rows = [
         [
             InlineKeyboardButton(
@@ -64,34 +76,96 @@ def _build_leads_keyboard(leads: list[Lead]) -> InlineKeyboardMarkup | None:
                 callback_data=f"lead_done:{lead.id}",
             )
         ]
-        for lead in new_leads
+        for _, lead in page.leads
+        if lead.status == "new"
     ]
-    return InlineKeyboardMarkup(inline_keyboard=rows)
+    if view == "new" and len(rows) > 1:
+        rows.append(
+            [
+                InlineKeyboardButton(
+                    text="Done: all shown",
+                    callback_data=build_page_range_callback(page.cursor(0), page.cursor(-1)),
+                )
+            ]
+        )
+    navigation = []
+    if page.has_previous:
+        navigation.append(
+            InlineKeyboardButton(text="« Назад", callback_data=build_page_callback(view, False, page.cursor(0)))
+        )
+    if page.has_next:
+        navigation.append(
+            InlineKeyboardButton(text="Далее »", callback_data=build_page_callback(view, True, page.cursor(-1)))
+        )
+    if navigation:
+        rows.append(navigation)
+    return InlineKeyboardMarkup(inline_keyboard=rows) if rows else None
+
+
+async def _format_leads_page(view: str, page: LeadPage) -> str:
+    if view == "new":
+        lines = [f"Новые заявки ({(await get_stats()).leads_new}):\n"]
+        for idx, (_, lead) in enumerate(page.leads, start=1):
+            lines.append(_format_lead_line(idx, lead))
+            lines.append("")
+        return "\n".join(lines).strip()
+
+    lines = ["Последние заявки:\n"]
+    for idx, (_, lead) in enumerate(page.leads, start=1):
+        status = "Новая" if lead.status == "new" else "Завершена"
+        lines.append(f"{_format_lead_line(idx, lead)}\n   Статус: {status}\n")
+    return "\n".join(lines)
+
+
+def _format_stats(snapshot: StatsSnapshot) -> str:
+    return (
+        "Статистика:\n\n"
+        f"Пользователи: {snapshot.users_count}\n"
+        f"Всего заявок: {snapshot.leads_total}\n"
+        f"Новые: {snapshot.leads_new}\n"
+        f"Завершенные: {snapshot.leads_completed}"
+    )
+
+
+async def _format_trend(view: str) -> str:
+    period, count, label_format, title = TREND_VIEWS[view]
+    buckets, median = await get_lead_trend(period, count)
+
+    lines = [title, ""]
+    for bucket in buckets:
+        lines.append(
+            f"{bucket.bucket_start:{label_format}}  новых: {bucket.leads_created}, "
+            f"завершено: {bucket.leads_completed}, напоминаний: {bucket.reminders_sent}"
+        )
+    lines.append("")
+    lines.append(
+        f"Итого: новых {sum(bucket.leads_created for bucket in buckets)}, "
+        f"завершено {sum(bucket.leads_completed for bucket in buckets)}"
+    )
+    median_text = completion_bucket_text(median) if median is not None else "нет данных"
+    lines.append(f"Медиана времени до завершения: {median_text}")
+    return "\n".join(lines)
 
 
 @router.message(Command("stats"))
-async def cmd_stats(message: Message) -> None:
+async def cmd_stats(message: Message, command: CommandObject) -> None:
     if not _is_admin(message.from_user.id if message.from_user else None):
         return
 
-    async with AsyncSessionLocal() as session:
-        users_count = await session.scalar(select(func.count()).select_from(User)) or 0
-        leads_total = await session.scalar(select(func.count()).select_from(Lead)) or 0
-        leads_new = await session.scalar(
-            select(func.count()).select_from(Lead).where(Lead.status == "new")
-        ) or 0
-        leads_completed = await session.scalar(
-            select(func.count()).select_from(Lead).where(Lead.status == "completed")
-        ) or 0
+    view = (command.args or "").strip().lower()
+    if view in TREND_VIEWS:
+        await message.answer(await _format_trend(view))
+        return
+    await message.answer(_format_stats(await get_stats()))
 
-    text = (
-        "Статистика:\n\n"
-        f"Пользователи: {users_count}\n"
-        f"Всего заявок: {leads_total}\n"
-        f"Новые: {leads_new}\n"
-        f"Завершенные: {leads_completed}"
-    )
-    await message.answer(text)
+
+@router.message(Command("stats_reconcile"))
+async def cmd_stats_reconcile(message: Message) -> None:
+    if not _is_admin(message.from_user.id if message.from_user else None):
+        return
+
+    snapshot = await reconcile_stats()
+    await message.answer(f"Счетчики пересчитаны.\n\n{_format_stats(snapshot)}")
 
 
 @router.message(Command("leads"))
@@ -99,29 +173,12 @@ async def cmd_leads(message: Message) -> None:
     if not _is_admin(message.from_user.id if message.from_user else None):
         return
 
-    async with AsyncSessionLocal() as session:
-        leads = (
-            await session.scalars(
-                select(Lead)
-                .order_by(
-                    case((Lead.status == "new", 0), else_=1),
-                    Lead.created_at.desc(),
-                )
-                .limit(10)
-            )
-        ).all()
-
-    if not leads:
+    page = await fetch_lead_page("all", LEADS_PAGE_SIZE)
+    if not page.leads:
         await message.answer("Заявок пока нет.")
         return
 
-    lines = ["Последние заявки:\n"]
-    for idx, lead in enumerate(leads, start=1):
-        status = "Новая" if lead.status == "new" else "Завершена"
-        lines.append(f"{_format_lead_line(idx, lead)}\n   Статус: {status}\n")
-
-    keyboard = _build_leads_keyboard(leads)
-    await message.answer("\n".join(lines), reply_markup=keyboard)
+    await message.answer(await _format_leads_page("all", page), reply_markup=_build_leads_keyboard("all", page))
 
 
 @router.message(Command("leads_new"))
@@ -129,27 +186,148 @@ async def cmd_leads_new(message: Message) -> None:
     if not _is_admin(message.from_user.id if message.from_user else None):
         return
 
-    async with AsyncSessionLocal() as session:
-        leads = (
-            await session.scalars(
-                select(Lead)
-                .where(Lead.status == "new")
-                .order_by(Lead.created_at.asc())
-                .limit(50)
-            )
-        ).all()
+    page = await fetch_lead_page("new", LEADS_PAGE_SIZE)
+    if not page.leads:
+        await message.answer("Новых заявок нет.")
+        return
+
+    await message.answer(await _format_leads_page("new", page), reply_markup=_build_leads_keyboard("new", page))
+
+
+@router.message(Command("find"))
+async def cmd_find(message: Message, command: CommandObject) -> None:
+    if not _is_admin(message.from_user.id if message.from_user else None):
+        return
+
+    query = (command.args or "").strip()
+    if len(query) < FIND_MIN_LENGTH:
+        await message.answer(f"Использование: /find <телефон или часть имени/услуги, от {FIND_MIN_LENGTH} символов>")
+        return
 
+    leads = await find_leads(query, FIND_LIMIT)
     if not leads:
-        await message.answer("Новых заявок нет.")
+        await message.answer("Ничего не найдено.")
         return
 
-    lines = [f"Новые заявки ({len(leads)}):\n"]
+    page = LeadPage(leads=[(0, lead) for lead in leads], has_previous=False, has_next=False)
+    lines = [f"Найдено ({len(leads)}):\n"]
     for idx, lead in enumerate(leads, start=1):
-        lines.append(_format_lead_line(idx, lead))
-        lines.append("")
+        status = "Новая" if lead.status == "new" else "Завершена"
+        lines.append(f"{_format_lead_line(idx, lead)}\n   Статус: {status}\n")
+    await message.answer("\n".join(lines), reply_markup=_build_leads_keyboard("find", page))
+
+
+@router.message(Command("export"))
+async def cmd_export(message: Message, command: CommandObject) -> None:
+    if not _is_admin(message.from_user.id if message.from_user else None):
+        return
+
+    parsed = parse_export_args(command.args)
+    if parsed is None:
+        await message.answer(
+            "Использование: /export [csv|ndjson] [new|completed] [from=ГГГГ-ММ-ДД] [to=ГГГГ-ММ-ДД] [cursor=имя]"
+        )
+        return
+
+    export = LeadExport(*parsed)
+    if not await export.has_rows():
+        await message.answer("Нет новых заявок для выгрузки." if export.filters.cursor else "Нет заявок для выгрузки.")
+        return
+    await message.answer_document(StreamingInputFile(export))
+    await export.commit_cursor()
 
-    keyboard = _build_leads_keyboard(leads)
-    await message.answer("\n".join(lines).strip(), reply_markup=keyboard)
+
+@router.callback_query(F.data.startswith("leads_page:"))
+async def on_leads_page(callback: CallbackQuery) -> None:
+    if not _is_admin(callback.from_user.id if callback.from_user else None):
+        await callback.answer()
+        return
+
+    parsed = parse_page_callback(callback.data)
+    if parsed is None or parsed[0] not in LEAD_VIEWS:
+        await callback.answer("Некорректная страница", show_alert=True)
+        return
+
+    view, forward, cursor = parsed
+    page = await fetch_lead_page(view, LEADS_PAGE_SIZE, cursor=cursor, forward=forward)
+    if not page.leads:
+        await callback.answer("Больше заявок нет")
+        return
+
+    if callback.message:
+        await callback.message.edit_text(
+            await _format_leads_page(view, page),
+            reply_markup=_build_leads_keyboard(view, page),
+        )
+    await callback.answer()
+
+
+def _mark_completed_buttons(
+    markup: InlineKeyboardMarkup | None,
+    lead_ids: set[int],
+    drop_bulk: bool,
+) -> InlineKeyboardMarkup | None:
+    """Drop the Done buttons of completed leads, and the bulk button once it has nothing left to do."""
+    if markup is None:
+        return None
+    rows = []
+    for row in markup.inline_keyboard:
+        buttons = [
+            button
+            for button in row
+            if parse_lead_id_from_callback(button.callback_data) not in lead_ids
+            and not (drop_bulk and (button.callback_data or "").startswith("done_all:"))
+        ]
+        if buttons:
+            rows.append(buttons)
+    if not any((button.callback_data or "").startswith("lead_done:") for row in rows for button in row):
+        rows = [row for row in rows if not (row[0].callback_data or "").startswith("done_all:")]
+    return InlineKeyboardMarkup(inline_keyboard=rows) if rows else None
+
+
+def _mark_completed_text(text: str, lead_ids: set[int]) -> str:
+    """Show completed leads of a /leads, /leads_new or /find message as completed."""
+    lines: list[str] = []
+    completed = False
+    has_status = False
+
+    def finish_block() -> None:
+        if completed and not has_status:
+            lines.append(_STATUS_COMPLETED_LINE)
+
+    for line in text.split("\n"):
+        match = _LEAD_LINE_RE.match(line)
+        if match or not line.strip():
+            finish_block()
+            completed = bool(match) and int(match.group(1)) in lead_ids
+            has_status = False
+            if completed:
+                line = line.replace(" [STALE]", "")
+        elif line.lstrip().startswith("Статус:"):
+            has_status = True
+            if completed:
+                line = _STATUS_COMPLETED_LINE
+        lines.append(line)
+    finish_block()
+    return "\n".join(lines)
+
+
+async def _show_completed(callback: CallbackQuery, lead_ids: list[int], drop_bulk: bool = False) -> None:
+    """Edit the message in place: completed leads get the new status and lose their Done buttons."""
+    message = callback.message
+    if not isinstance(message, Message) or not message.text or not lead_ids:
+        return
+    markup = _mark_completed_buttons(message.reply_markup, set(lead_ids), drop_bulk)
+    if any(_LEAD_LINE_RE.match(line) for line in message.text.split("\n")):
+        text, parse_mode = _mark_completed_text(message.text, set(lead_ids)), None
+        if text == message.text and markup == message.reply_markup:
+            return
+    else:
+        # The HTML admin alert for a single lead.
+        text, parse_mode = message.html_text, ParseMode.HTML
+        if not text.endswith(_ALERT_COMPLETED_TEXT):
+            text += _ALERT_COMPLETED_TEXT
+    await message.edit_text(text, parse_mode=parse_mode, reply_markup=markup)
 
 
 @router.callback_query(F.data.startswith("lead_done:"))
@@ -163,45 +341,42 @@ async def on_lead_done(callback: CallbackQuery) -> None:
         await callback.answer("Некорректный ID заявки", show_alert=True)
         return
 
-    async with AsyncSessionLocal() as session:
-        lead = await session.get(Lead, lead_id)
-        if not lead:
-            await callback.answer("Заявка не найдена", show_alert=True)
-            return
-
-        lead.status = "completed"
-        lead.last_reminder_at = None
-        await session.commit()
+    if not await complete_leads([lead_id]):
+        await callback.answer("Заявка не найдена или уже завершена", show_alert=True)
+        return
 
+    await _show_completed(callback, [lead_id])
     await callback.answer("Заявка отмечена как завершенная")
 
 
-async def send_stale_lead_reminders(bot: Bot) -> None:
-    now = datetime.now(UTC)
-    stale_cutoff = now - timedelta(hours=STALE_AFTER_HOURS)
-    repeat_cutoff = now - timedelta(hours=REMINDER_REPEAT_HOURS)
+@router.callback_query(F.data.startswith("done_all:"))
+async def on_page_done(callback: CallbackQuery) -> None:
+    if not _is_admin(callback.from_user.id if callback.from_user else None):
+        await callback.answer()
+        return
 
-    async with AsyncSessionLocal() as session:
-        overdue_leads = (
-            await session.scalars(
-                select(Lead)
-                .where(
-                    Lead.status == "new",
-                    Lead.created_at <= stale_cutoff,
-                    or_(Lead.last_reminder_at.is_(None), Lead.last_reminder_at <= repeat_cutoff),
-                )
-                .order_by(Lead.created_at.asc())
-            )
-        ).all()
+    page_range = parse_page_range_callback(callback.data)
+    if page_range is None:
+        await callback.answer("Некорректная страница", show_alert=True)
+        return
 
-        for lead in overdue_leads:
-            age = _time_ago_text(lead.created_at)
-            await bot.send_message(
-                chat_id=settings.admin_id,
-                text=f"Просроченная заявка от {lead.name}: ожидает {age}.",
-            )
-            lead.last_reminder_at = now
-            lead.reminder_count += 1
+    lead_ids = await complete_leads_between(*page_range)
+    await _show_completed(callback, lead_ids, drop_bulk=True)
+    await callback.answer(f"Завершено заявок: {len(lead_ids)}")
+
+
+@router.message(Command("done_older"))
+async def cmd_done_older(message: Message, command: CommandObject) -> None:
+    if not _is_admin(message.from_user.id if message.from_user else None):
+        return
+
+    try:
+        hours = int((command.args or "").strip())
+    except ValueError:
+        hours = 0
+    if hours <= 0:
+        await message.answer("Использование: /done_older <часы>")
+        return
 
-        if overdue_leads:
-            await session.commit()
+    lead_ids = await complete_leads_older_than(datetime.now(UTC) - timedelta(hours=hours))
+    await message.answer(f"Завершено заявок старше {hours} ч: {len(lead_ids)}")
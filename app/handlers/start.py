@@ -2,8 +2,8 @@
 from aiogram.filters import CommandStart
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
+from aiogram.methods import SendMessage
 from aiogram.types import Message
-from sqlalchemy import select
 
 from app.content import (
     ASK_COMMENT_TEXT,
@@ -19,11 +19,10 @@ from app.content import (
     LEAD_SAVED_TEXT,
     REVIEWS_TEXT,
 )
-from app.database import AsyncSessionLocal
 from app.keyboards.menus import get_cancel_keyboard, get_main_menu_keyboard
-from app.models.lead import Lead
-from app.models.user import User
-from app.services.notifier import notify_admin_about_lead
+from app.services.fsm_storage import clear_form, update_form
+from app.services.leads import create_lead
+from app.services.users import ensure_user
 
 router = Router()
 
@@ -39,24 +38,12 @@ async def _save_user_if_new(message: Message) -> None:
     if not message.from_user:
         return
 
-    async with AsyncSessionLocal() as session:
-        query = select(User).where(User.telegram_id == message.from_user.id)
-        existing_user = await session.scalar(query)
-        if existing_user:
-            return
-
-        session.add(
-            User(
-                telegram_id=message.from_user.id,
-                username=message.from_user.username,
-            )
-        )
-        await session.commit()
+    await ensure_user(message.from_user.id, message.from_user.username)
 
 
 @router.message(CommandStart())
 async def cmd_start(message: Message, state: FSMContext) -> None:
-    await state.clear()
+    await clear_form(state)
     await _save_user_if_new(message)
     first_name = message.from_user.first_name if message.from_user else "друг"
     await message.answer(
@@ -66,59 +53,54 @@ async def cmd_start(message: Message, state: FSMContext) -> None:
 
 
 @router.message(F.text == BTN_CREATE_LEAD)
-async def on_create_lead(message: Message, state: FSMContext) -> None:
+async def on_create_lead(message: Message, state: FSMContext) -> SendMessage:
     await state.set_state(LeadForm.name)
-    await message.answer(ASK_NAME_TEXT, reply_markup=get_cancel_keyboard())
+    return message.answer(ASK_NAME_TEXT, reply_markup=get_cancel_keyboard())
 
 
 @router.message(F.text == BTN_CONTACTS)
-async def on_contacts(message: Message) -> None:
-    await message.answer(CONTACTS_TEXT)
+async def on_contacts(message: Message) -> SendMessage:
+    return message.answer(CONTACTS_TEXT)
 
 
 @router.message(F.text == BTN_REVIEWS)
-async def on_reviews(message: Message) -> None:
-    await message.answer(REVIEWS_TEXT)
+async def on_reviews(message: Message) -> SendMessage:
+    return message.answer(REVIEWS_TEXT)
 
 
 @router.message(F.text == BTN_CANCEL)
-async def on_cancel(message: Message, state: FSMContext) -> None:
-    await state.clear()
-    await message.answer(CANCEL_TEXT, reply_markup=get_main_menu_keyboard())
+async def on_cancel(message: Message, state: FSMContext) -> SendMessage:
+    await clear_form(state)
+    return message.answer(CANCEL_TEXT, reply_markup=get_main_menu_keyboard())
 
 
 @router.message(LeadForm.name, F.text)
-async def on_name_received(message: Message, state: FSMContext) -> None:
+async def on_name_received(message: Message, state: FSMContext) -> SendMessage:
     name = message.text.strip()
     if not name:
-        await message.answer("Имя не может быть пустым. Попробуйте еще раз.")
-        return
+        return message.answer("Имя не может быть пустым. Попробуйте еще раз.")
 
-    await state.update_data(name=name)
-    await state.set_state(LeadForm.phone)
-    await message.answer(ASK_PHONE_TEXT, reply_markup=get_cancel_keyboard())
+    await update_form(state, LeadForm.phone, name=name)
+    return message.answer(ASK_PHONE_TEXT, reply_markup=get_cancel_keyboard())
 
 
 @router.message(LeadForm.phone, F.text)
-async def on_phone_received(message: Message, state: FSMContext) -> None:
+async def on_phone_received(message: Message, state: FSMContext) -> SendMessage:
     phone = message.text.strip()
     if not phone:
-        await message.answer("Телефон не может быть пустым. Попробуйте еще раз.")
-        return
+        return message.answer("Телефон не может быть пустым. Попробуйте еще раз.")
 
-    await state.update_data(phone=phone)
-    await state.set_state(LeadForm.service)
-    await message.answer(ASK_SERVICE_TEXT, reply_markup=get_cancel_keyboard())
+    await update_form(state, LeadForm.service, phone=phone)
+    return message.answer(ASK_SERVICE_TEXT, reply_markup=get_cancel_keyboard())
 
 
 @router.message(LeadForm.service, F.text)
-async def on_service_received(message: Message, state: FSMContext) -> None:
+async def on_service_received(message: Message, state: FSMContext) -> SendMessage:
     service_raw = message.text.strip()
     service = None if service_raw in {"", "-"} else service_raw
 
-    await state.update_data(service=service)
-    await state.set_state(LeadForm.comment)
-    await message.answer(ASK_COMMENT_TEXT, reply_markup=get_cancel_keyboard())
+    await update_form(state, LeadForm.comment, service=service)
+    return message.answer(ASK_COMMENT_TEXT, reply_markup=get_cancel_keyboard())
 
 
 @router.message(LeadForm.comment, F.text)
@@ -131,40 +113,22 @@ async def on_comment_received(message: Message, state: FSMContext) -> None:
     phone = data.get("phone")
     service = data.get("service")
     if not name or not phone or not message.from_user:
-        await state.clear()
+        await clear_form(state)
         await message.answer(
             "Не удалось сохранить заявку. Пожалуйста, начните заново.",
             reply_markup=get_main_menu_keyboard(),
         )
         return
 
-    await _save_user_if_new(message)
-
-    async with AsyncSessionLocal() as session:
-        lead = Lead(
-            user_id=message.from_user.id,
-            name=name,
-            phone=phone,
-            service=service,
-            comment=comment,
-        )
-        session.add(lead)
-        await session.commit()
-        await session.refresh(lead)
-
-    try:
-        await notify_admin_about_lead(
-            bot=message.bot,
-            lead_id=lead.id,
-            name=name,
-            phone=phone,
-            service=service,
-            comment=comment,
-            username=message.from_user.username,
-        )
-    except Exception:
-        # Lead is already stored in DB; do not fail the whole update on notify errors.
-        pass
+    # The admin alert is queued in the outbox by the same transaction.
+    await create_lead(
+        telegram_id=message.from_user.id,
+        username=message.from_user.username,
+        name=name,
+        phone=phone,
+        service=service,
+        comment=comment,
+    )
 
-    await state.clear()
+    await clear_form(state)
     await message.answer(LEAD_SAVED_TEXT, reply_markup=get_main_menu_keyboard())
@@ -1,3 +1,5 @@
+import json
+
 from aiogram.types import (
     InlineKeyboardButton,
     InlineKeyboardMarkup,
@@ -6,11 +8,12 @@ from aiogram.types import (
 )
 
 from app.content import BTN_CANCEL, BTN_CONTACTS, BTN_CREATE_LEAD, BTN_REVIEWS
+from app.keyboards.serialized import static_markup
 from app.utils.logic import normalize_phone
 
 
-def get_main_menu_keyboard() -> ReplyKeyboardMarkup:
-    return ReplyKeyboardMarkup(
+_MAIN_MENU_KEYBOARD = static_markup(
+    ReplyKeyboardMarkup(
         keyboard=[
             [KeyboardButton(text=BTN_CREATE_LEAD)],
             [KeyboardButton(text=BTN_CONTACTS)],
@@ -19,22 +22,47 @@ def get_main_menu_keyboard() -> ReplyKeyboardMarkup:
         resize_keyboard=True,
         is_persistent=True,
     )
+)
 
-
-def get_cancel_keyboard() -> ReplyKeyboardMarkup:
-    return ReplyKeyboardMarkup(
+_CANCEL_KEYBOARD = static_markup(
+    ReplyKeyboardMarkup(
         keyboard=[[KeyboardButton(text=BTN_CANCEL)]],
         resize_keyboard=True,
         one_time_keyboard=False,
     )
+)
+
+# Same JSON as get_admin_lead_keyboard(...).model_dump_json(exclude_none=True).
+_ADMIN_LEAD_KEYBOARD_JSON = (
+    '{{"inline_keyboard":[[{{"text":"Call","url":{url}}}],'
+    '[{{"text":"Done","callback_data":{callback_data}}}]]}}'
+)
+
+
+def get_main_menu_keyboard() -> ReplyKeyboardMarkup:
+    return _MAIN_MENU_KEYBOARD
+
+
+def get_cancel_keyboard() -> ReplyKeyboardMarkup:
+    return _CANCEL_KEYBOARD
+
+
+def _whatsapp_link(phone: str) -> str:
+    return f"https://wa.me/{normalize_phone(phone).replace('+', '')}"
 
 
 def get_admin_lead_keyboard(phone: str, lead_id: int) -> InlineKeyboardMarkup:
-    phone_link = normalize_phone(phone)
-    whatsapp_link = f"https://wa.me/{phone_link.replace('+', '')}"
     return InlineKeyboardMarkup(
         inline_keyboard=[
-            [InlineKeyboardButton(text="Call", url=whatsapp_link)],
+            [InlineKeyboardButton(text="Call", url=_whatsapp_link(phone))],
             [InlineKeyboardButton(text="Done", callback_data=f"lead_done:{lead_id}")],
         ]
     )
+
+
+def render_admin_lead_keyboard(phone: str, lead_id: int) -> str:
+    """Serialized admin lead keyboard, rendered without building the pydantic models."""
+    return _ADMIN_LEAD_KEYBOARD_JSON.format(
+        url=json.dumps(_whatsapp_link(phone)),
+        callback_data=json.dumps(f"lead_done:{lead_id}"),
+    )
@@ -0,0 +1,38 @@
+from typing import Any, TypeVar
+
+from aiogram.types import InlineKeyboardMarkup, TelegramObject
+
+from app.utils.lru import LRUCache
+
+MarkupT = TypeVar("MarkupT", bound=TelegramObject)
+
+# id(markup) -> (markup, JSON). Keeping the markup in the entry pins it, so its
+# id cannot be reused by another object while the entry exists.
+_STATIC: dict[int, tuple[Any, str]] = {}
+_RECENT: LRUCache[int, tuple[Any, str]] = LRUCache(capacity=1000)
+
+
+def static_markup(markup: MarkupT) -> MarkupT:
+    """Register a keyboard shared by every reply and serialize it once.
+
+    Registered markups must not be modified afterwards.
+    """
+    _STATIC[id(markup)] = (markup, markup.model_dump_json(exclude_none=True))
+    return markup
+
+
+def markup_from_json(data: str) -> InlineKeyboardMarkup:
+    """Parse a stored keyboard and remember its JSON so it is sent as is."""
+    markup = InlineKeyboardMarkup.model_validate_json(data)
+    _RECENT.put(id(markup), (markup, data))
+    return markup
+
+
+def serialized_markup(markup: Any) -> str | None:
+    if markup is None:
+        return None
+    key = id(markup)
+    entry = _STATIC.get(key) or _RECENT.get(key)
+    if entry is None or entry[0] is not markup:
+        return None
+    return entry[1]
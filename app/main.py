@@ -1,43 +1,126 @@
 import asyncio
+import hmac
+import json
+import logging
+import time
 from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Literal
 
+from aiogram.methods import TelegramMethod
 from aiogram.types import Update
-from fastapi import FastAPI, Header, HTTPException, Request
-from sqlalchemy.exc import IntegrityError
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import ValidationError
 
 from app.bot import bot, dp
 from app.config import settings
-from app.database import AsyncSessionLocal, run_migrations
-from app.handlers.admin import send_stale_lead_reminders
-from app.models.processed_update import ProcessedUpdate
-from app.utils.logic import extract_update_id
+from app.database import create_leader_engine, run_migrations, warm_up_pool
+from app.services.archive import archive_completed_leads
+from app.services.dedup import purge_processed_updates, register_update, update_batcher
+from app.services.export import LeadExport
+from app.services.fsm_storage import purge_expired_fsm_states
+from app.services.leader import LeaderElection
+from app.services.metrics import Counter, Histogram, render_metrics
+from app.services.outbox import OUTBOX_CHANNEL, OutboxDispatcher, purge_sent_notifications, wake_outbox
+from app.services.reminders import REMINDER_CHANNEL, reminder_scheduler
+from app.services.replica import replica_monitor
+from app.services.rollups import backfill_lead_rollups
+from app.services.update_queue import UpdateQueue
+from app.services.webhook_reply import WEBHOOK_REPLY_CALLS, build_webhook_reply, call_handler_result
+from app.utils.export import EXPORT_CURSOR_RE, ExportFilters
+from app.utils.logic import extract_update_id, extract_update_id_from_body
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_LATENCY = Histogram("webhook_request_seconds", "Webhook handling time from request to response.")
+WEBHOOK_PHASE = Histogram("webhook_phase_seconds", "Webhook handling time by phase.", ["phase"])
+WEBHOOK_PARSE = WEBHOOK_PHASE.labels("parse")
+WEBHOOK_DEDUP = WEBHOOK_PHASE.labels("dedup")
+WEBHOOK_DISPATCH = WEBHOOK_PHASE.labels("dispatch")
+WEBHOOK_REJECTED_SECRET = Counter("webhook_rejected_secret_total", "Webhook requests with a wrong secret token.")
 
 WEBHOOK_PATH = "/telegram/webhook"
+# Every accepted update gets the same answer, so it is serialized once.
+WEBHOOK_OK_BODY = b'{"ok":true}'
 WEBHOOK_URL = f"{settings.host_url}{WEBHOOK_PATH}"
 
+update_queue = (
+    UpdateQueue(workers=settings.update_queue_workers, maxsize=settings.update_queue_maxsize)
+    if settings.update_queue_workers > 0
+    else None
+)
 
-async def _reminder_loop() -> None:
+
+async def _retention_loop() -> None:
     while True:
-        await send_stale_lead_reminders(bot)
-        await asyncio.sleep(30 * 60)
+        try:
+            await purge_processed_updates(
+                timedelta(hours=settings.processed_updates_retention_hours),
+                settings.processed_updates_purge_batch,
+            )
+            await purge_sent_notifications(
+                timedelta(days=settings.outbox_retention_days),
+                settings.processed_updates_purge_batch,
+            )
+            if settings.archive_after_days > 0:
+                await archive_completed_leads(
+                    timedelta(days=settings.archive_after_days),
+                    settings.archive_batch_size,
+                )
+            if settings.fsm_storage == "postgres":
+                await purge_expired_fsm_states(
+                    timedelta(hours=settings.fsm_state_ttl_hours),
+                    settings.processed_updates_purge_batch,
+                )
+        except Exception:
+            logger.exception("Failed to purge old rows")
+        await asyncio.sleep(settings.processed_updates_purge_interval_minutes * 60)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await asyncio.to_thread(run_migrations)
+    await warm_up_pool(settings.pool.warmup)
     await bot.set_webhook(
         url=WEBHOOK_URL,
         secret_token=settings.webhook_secret,
         allowed_updates=dp.resolve_used_update_types(),
         drop_pending_updates=True,
     )
-    reminder_task = asyncio.create_task(_reminder_loop())
+    if update_queue is not None:
+        update_queue.start(bot, dp)
+    outbox_dispatcher = OutboxDispatcher(
+        bot,
+        batch_size=settings.outbox_batch_size,
+        global_rate=settings.outbox_global_rate,
+        per_chat_rate=settings.outbox_per_chat_rate,
+        max_attempts=settings.outbox_max_attempts,
+    )
+    # Jobs that must run once per cluster go through leader election. The
+    # outbox dispatcher is one of them: its Telegram rate limits are per process.
+    leader = LeaderElection(create_leader_engine(), retry_interval=settings.leader_retry_seconds)
+    leader.add_job("outbox", outbox_dispatcher.run)
+    leader.add_listener(OUTBOX_CHANNEL, lambda payload: wake_outbox())
+    leader.add_job("reminders", reminder_scheduler.run)
+    leader.add_listener(REMINDER_CHANNEL, reminder_scheduler.lead_notified)
+    leader.add_job("retention", _retention_loop)
+    leader.add_job("rollup_backfill", lambda: backfill_lead_rollups(settings.rollup_backfill_batch))
+    background_tasks = [asyncio.create_task(leader.run())]
+    if replica_monitor is not None:
+        # Every process routes its own reads, so each one watches the replica.
+        await replica_monitor.check()
+        background_tasks.append(asyncio.create_task(replica_monitor.run()))
     yield
-    reminder_task.cancel()
-    try:
-        await reminder_task
-    except asyncio.CancelledError:
-        pass
+    if update_queue is not None:
+        await update_queue.drain(settings.update_queue_drain_timeout)
+    if update_batcher is not None:
+        # Otherwise the ids of the last batch are never committed.
+        await update_batcher.drain()
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await dp.storage.close()
     await bot.session.close()
 
 
@@ -49,28 +132,96 @@ async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> str:
+    return render_metrics()
+
+
+@app.get("/export/leads")
+async def export_leads(
+    authorization: str | None = Header(default=None),
+    format: Literal["csv", "ndjson"] = "csv",
+    status: Literal["new", "completed"] | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    cursor: str | None = Query(default=None, pattern=EXPORT_CURSOR_RE.pattern),
+) -> StreamingResponse:
+    if not settings.export_token:
+        raise HTTPException(status_code=404, detail="Export is disabled")
+    # Compared as bytes: compare_digest rejects str with non-ASCII characters.
+    if not hmac.compare_digest((authorization or "").encode(), f"Bearer {settings.export_token}".encode()):
+        raise HTTPException(status_code=401, detail="Invalid export token")
+
+    export = LeadExport(
+        format,
+        ExportFilters(status=status, created_from=created_from, created_to=created_to, cursor=cursor),
+    )
+    return StreamingResponse(
+        export.stream(),
+        media_type=export.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{export.filename}"'},
+    )
+
+
 @app.post(WEBHOOK_PATH)
 async def telegram_webhook(
     request: Request,
     x_telegram_bot_api_secret_token: str | None = Header(default=None),
-) -> dict[str, bool]:
+) -> Response:
     if x_telegram_bot_api_secret_token != settings.webhook_secret:
+        WEBHOOK_REJECTED_SECRET.inc()
         raise HTTPException(status_code=403, detail="Invalid telegram webhook secret")
 
-    payload = await request.json()
-    update_id = extract_update_id(payload)
+    started = time.perf_counter()
+    body = await request.body()
+    # Duplicates are rejected from the raw bytes; the body is only decoded in
+    # full when update_id is not its first key.
+    payload = None
+    update_id = extract_update_id_from_body(body)
     if update_id is None:
-        raise HTTPException(status_code=400, detail="Invalid telegram payload: missing update_id")
-
-    async with AsyncSessionLocal() as session:
-        session.add(ProcessedUpdate(update_id=update_id))
         try:
-            await session.commit()
-        except IntegrityError:
-            await session.rollback()
-            # Telegram can retry the same update. Ignore duplicates.
-            return {"ok": True}
-
-    update = Update.model_validate(payload)
-    await dp.feed_update(bot, update)
-    return {"ok": True}
+            payload = json.loads(body)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid telegram payload: malformed JSON") from None
+        update_id = extract_update_id(payload) if isinstance(payload, dict) else None
+    if update_id is None:
+        raise HTTPException(status_code=400, detail="Invalid telegram payload: missing update_id")
+    parsed = time.perf_counter()
+
+    is_new = await register_update(update_id)
+    deduped = time.perf_counter()
+    WEBHOOK_DEDUP.observe(deduped - parsed)
+    if not is_new:
+        # Telegram can retry the same update. Ignore duplicates.
+        WEBHOOK_PARSE.observe(parsed - started)
+        WEBHOOK_LATENCY.observe(deduped - started)
+        return Response(WEBHOOK_OK_BODY, media_type="application/json")
+
+    # Validating with the bot in the context mounts it on the update, so
+    # feed_update does not re-validate the whole update a second time.
+    try:
+        if payload is None:
+            update = Update.model_validate_json(body, context={"bot": bot})
+        else:
+            update = Update.model_validate(payload, context={"bot": bot})
+    except ValidationError:
+        raise HTTPException(status_code=400, detail="Invalid telegram payload") from None
+    validated = time.perf_counter()
+    WEBHOOK_PARSE.observe((parsed - started) + (validated - deduped))
+    response_body = WEBHOOK_OK_BODY
+    if update_queue is not None:
+        await update_queue.put(update)
+    else:
+        result = await dp.feed_update(bot, update)
+        # A Bot API call returned by the handler can ride on this response
+        # instead of costing a separate request to api.telegram.org.
+        reply = build_webhook_reply(bot, result) if settings.webhook_reply and isinstance(result, TelegramMethod) else None
+        if reply is not None:
+            WEBHOOK_REPLY_CALLS.labels(result.__api_method__).inc()
+            response_body = reply
+        else:
+            await call_handler_result(bot, result)
+    finished = time.perf_counter()
+    WEBHOOK_DISPATCH.observe(finished - validated)
+    WEBHOOK_LATENCY.observe(finished - started)
+    return Response(response_body, media_type="application/json")
@@ -0,0 +1 @@
+# aiogram dispatcher and Bot API session middlewares.
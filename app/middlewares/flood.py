@@ -0,0 +1,102 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Collection, Mapping
+from typing import Any
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import CallbackQuery, Message, TelegramObject, Update, User
+
+from app.services.metrics import Counter
+from app.utils.lru import LRUCache
+from app.utils.rate_limit import TokenBucket
+
+FLOOD_THROTTLED = Counter(
+    "flood_throttled_updates_total",
+    "Updates dropped or delayed by per-user flood control.",
+    ["group", "action"],
+)
+
+
+def flood_group(event: TelegramObject) -> str:
+    if isinstance(event, CallbackQuery):
+        return "callback"
+    if isinstance(event, Message) and event.text and event.text.startswith("/"):
+        command = event.text[1:].split(maxsplit=1)
+        if command:
+            return command[0].partition("@")[0].lower()
+    return "text"
+
+
+def _throttled_event(event: TelegramObject) -> TelegramObject | None:
+    # Only new messages and button presses are throttled.
+    if isinstance(event, Update):
+        return event.message or event.callback_query
+    return event
+
+
+class FloodControlMiddleware(BaseMiddleware):
+    """Outer middleware that throttles each user with a token bucket per limit group.
+
+    Groups without their own limit share the user's "default" bucket. Buckets
+    live in an LRU, so a flood of distinct users only evicts idle buckets.
+    See :func:`setup_flood_control` for where it has to be registered.
+    """
+
+    def __init__(
+        self,
+        limits: Mapping[str, tuple[float, float]],
+        action: str = "drop",
+        max_delay: float = 2.0,
+        exempt_user_ids: Collection[int] = (),
+        cache_size: int = 10000,
+    ) -> None:
+        self.limits = dict(limits)
+        self.action = action
+        self.max_delay = max_delay
+        self.exempt_user_ids = frozenset(exempt_user_ids)
+        self._buckets: LRUCache[tuple[int, str], TokenBucket] = LRUCache(cache_size)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        user: User | None = data.get("event_from_user")
+        throttled = _throttled_event(event)
+        if user is None or throttled is None or user.id in self.exempt_user_ids:
+            return await handler(event, data)
+
+        group = flood_group(throttled)
+        if group not in self.limits:
+            group = "default"
+        key = (user.id, group)
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate, burst = self.limits[group]
+            bucket = TokenBucket(rate, capacity=burst, now=now)
+            self._buckets.put(key, bucket)
+
+        wait = bucket.delay(now)
+        if wait > 0:
+            if self.action != "delay" or wait > self.max_delay:
+                FLOOD_THROTTLED.labels(group, "dropped").inc()
+                return None
+            FLOOD_THROTTLED.labels(group, "delayed").inc()
+            await asyncio.sleep(bucket.reserve(now))
+        else:
+            bucket.consume(now)
+        return await handler(event, data)
+
+
+def setup_flood_control(dispatcher: Dispatcher, middleware: FloodControlMiddleware) -> None:
+    """Throttle updates before aiogram resolves their FSM context.
+
+    The FSM middleware reads the state from storage (Postgres by default), so
+    the dispatcher must be created with ``disable_fsm=True``; its FSM
+    middleware is registered here after flood control. Both come after
+    aiogram's user context middleware, which provides ``event_from_user``.
+    """
+    dispatcher.update.outer_middleware(middleware)
+    dispatcher.update.outer_middleware(dispatcher.fsm)
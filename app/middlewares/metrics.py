@@ -0,0 +1,83 @@
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from aiogram import BaseMiddleware, Bot, Dispatcher
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.methods import Response, TelegramMethod
+from aiogram.types import TelegramObject
+
+from app.services.metrics import Counter, Histogram
+
+HANDLER_LATENCY = Histogram("bot_handler_seconds", "Time spent in aiogram handlers.", ["handler"])
+HANDLER_ERRORS = Counter("bot_handler_errors_total", "aiogram handlers that raised.", ["handler"])
+BOT_API_LATENCY = Histogram("bot_api_request_seconds", "Outbound Bot API call latency by method.", ["method"])
+BOT_API_ERRORS = Counter("bot_api_errors_total", "Failed outbound Bot API calls by method and error.", ["method", "error"])
+
+
+def _handler_name(handler: HandlerObject | None) -> str:
+    if handler is None:
+        return "unknown"
+    callback = handler.callback
+    return f"{getattr(callback, '__module__', '')}.{getattr(callback, '__qualname__', type(callback).__name__)}"
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Inner middleware timing the handler that matched an event."""
+
+    def __init__(self) -> None:
+        # Labelled children are looked up once per handler instead of per event.
+        self._children: dict[int, tuple[Any, Any]] = {}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        handler_object = data.get("handler")
+        key = id(handler_object)
+        children = self._children.get(key)
+        if children is None:
+            name = _handler_name(handler_object)
+            children = (HANDLER_LATENCY.labels(name), HANDLER_ERRORS.labels(name))
+            self._children[key] = children
+
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            children[1].inc()
+            raise
+        finally:
+            children[0].observe(time.perf_counter() - started)
+
+
+class BotApiMetricsMiddleware(BaseRequestMiddleware):
+    """Session middleware timing every Bot API call, including failed ones."""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod,
+    ) -> Response:
+        name = method.__api_method__
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as exc:
+            BOT_API_ERRORS.labels(name, type(exc).__name__).inc()
+            raise
+        finally:
+            BOT_API_LATENCY.labels(name).observe(time.perf_counter() - started)
+
+
+def setup_metrics_middlewares(dispatcher: Dispatcher, bot: Bot) -> None:
+    # Inner middlewares on the dispatcher also wrap handlers of every nested router.
+    handler_metrics = HandlerMetricsMiddleware()
+    for name, observer in dispatcher.observers.items():
+        if name not in ("update", "error"):
+            observer.middleware(handler_metrics)
+    bot.session.middleware(BotApiMetricsMiddleware())
@@ -1,5 +1,23 @@
 from app.models.user import User
 from app.models.lead import Lead
+from app.models.lead_archive import LeadArchive
+from app.models.export_cursor import ExportCursor
+from app.models.fsm_state import FsmState
+from app.models.notification import NotificationOutbox
 from app.models.processed_update import ProcessedUpdate
+from app.models.rollup import LeadCompletionTime, LeadRollup, LeadRollupBackfill
+from app.models.stats import StatsCounters
 
-__all__ = ["User", "Lead", "ProcessedUpdate"]
+__all__ = [
+    "User",
+    "Lead",
+    "LeadArchive",
+    "ExportCursor",
+    "FsmState",
+    "NotificationOutbox",
+    "ProcessedUpdate",
+    "LeadRollup",
+    "LeadCompletionTime",
+    "LeadRollupBackfill",
+    "StatsCounters",
+]
@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, String, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ExportCursor(Base):
+    """Highest lead id delivered by the last completed export under ``name``."""
+
+    __tablename__ = "export_cursors"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    last_lead_id: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, SmallInteger, String, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+ROLLUP_BACKFILL_ROW_ID = 1
+
+
+class LeadRollup(Base):
+    """Lead activity per UTC hour and per UTC day (``period`` is ``hour`` or ``day``)."""
+
+    __tablename__ = "lead_rollups"
+
+    period: Mapped[str] = mapped_column(String(4), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    leads_created: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    leads_completed: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    completion_seconds: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    reminders_sent: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default=text("0"))
+
+
+class LeadCompletionTime(Base):
+    """Daily histogram of time-to-completion; ``bucket`` indexes ``COMPLETION_TIME_BUCKETS``."""
+
+    __tablename__ = "lead_completion_times"
+
+    day: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    bucket: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default=text("0"))
+
+
+class LeadRollupBackfill(Base):
+    """Progress of rebuilding rollups for leads created before they were maintained."""
+
+    __tablename__ = "lead_rollup_backfill"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    last_lead_id: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    max_lead_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+STATS_ROW_ID = 1
+
+
+class StatsCounters(Base):
+    """Single-row table of totals shown by /stats."""
+
+    __tablename__ = "stats_counters"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    users_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    leads_total: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    leads_new: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    leads_completed: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default=text("0"))
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,48 @@
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import text
+
+from app.database import AsyncSessionLocal
+from app.services.metrics import Counter
+
+ARCHIVED_LEADS = Counter("leads_archived_total", "Completed leads moved to leads_archive.")
+
+# Moves one batch in a single statement. created_at < cutoff narrows the scan
+# to the completed-leads range of ix_leads_status_created_at_id; leads completed
+# before completed_at existed fall back to their creation time.
+_ARCHIVE_BATCH_SQL = text(
+    """
+    WITH moved AS (
+        DELETE FROM leads
+        WHERE id IN (
+            SELECT id FROM leads
+            WHERE status = 'completed'
+              AND created_at < :cutoff
+              AND coalesce(completed_at, created_at) < :cutoff
+            ORDER BY created_at, id
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, user_id, name, phone, phone_normalized, service, comment, status,
+                  created_at, completed_at, last_reminder_at, reminder_count
+    )
+    INSERT INTO leads_archive (
+        id, user_id, name, phone, phone_normalized, service, comment, status,
+        created_at, completed_at, last_reminder_at, reminder_count
+    )
+    SELECT * FROM moved
+    """
+)
+
+
+async def archive_completed_leads(age: timedelta, batch_size: int) -> int:
+    """Move leads completed more than ``age`` ago into leads_archive, one batch per transaction."""
+    cutoff = datetime.now(UTC) - age
+    archived = 0
+    while True:
+        async with AsyncSessionLocal.begin() as session:
+            result = await session.execute(_ARCHIVE_BATCH_SQL, {"cutoff": cutoff, "batch_size": batch_size})
+        archived += result.rowcount
+        ARCHIVED_LEADS.inc(result.rowcount)
+        if result.rowcount < batch_size:
+            return archived
@@ -0,0 +1,99 @@
+import asyncio
+from collections.abc import Mapping
+from typing import Any
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
+from aiogram.exceptions import TelegramNetworkError, TelegramServerError
+from aiogram.methods import TelegramMethod
+from aiogram.types import InputFile
+from aiohttp import FormData
+
+from app.config import BotApiSettings
+from app.keyboards.serialized import serialized_markup
+from app.services.metrics import Counter
+from app.utils.rate_limit import backoff_delay
+
+BOT_API_RETRIES = Counter(
+    "bot_api_retries_total",
+    "Idempotent Bot API calls retried after a network or server error.",
+    ["method"],
+)
+
+# Methods besides get* that can be repeated without a visible side effect.
+IDEMPOTENT_METHODS = frozenset({"setWebhook", "deleteWebhook", "setMyCommands", "deleteMyCommands"})
+
+
+def is_idempotent(method_name: str) -> bool:
+    return method_name.startswith("get") or method_name in IDEMPOTENT_METHODS
+
+
+class BotSession(AiohttpSession):
+    """aiohttp session tuned for the Bot API.
+
+    Pre-serialized keyboards are sent as they are, timeouts can be set per
+    method, and idempotent calls are retried after network and 5xx errors.
+    Sends are never retried here: a timed out request may still have been
+    delivered.
+    """
+
+    def __init__(
+        self,
+        method_timeouts: Mapping[str, float] | None = None,
+        keepalive_timeout: float = 15.0,
+        dns_cache_ttl: int = 3600,
+        retries: int = 0,
+        retry_backoff: float = 0.5,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.method_timeouts = dict(method_timeouts or {})
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self._connector_init.update(keepalive_timeout=keepalive_timeout, ttl_dns_cache=dns_cache_ttl)
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[Any], timeout: int | None = None) -> Any:
+        name = method.__api_method__
+        if timeout is None:
+            timeout = self.method_timeouts.get(name)
+        attempts = 1 + self.retries if is_idempotent(name) else 1
+        for attempt in range(1, attempts + 1):
+            try:
+                return await super().make_request(bot, method, timeout=timeout)
+            except (TelegramNetworkError, TelegramServerError):
+                if attempt >= attempts:
+                    raise
+            BOT_API_RETRIES.labels(name).inc()
+            await asyncio.sleep(backoff_delay(attempt, base=self.retry_backoff, cap=10.0))
+
+    def build_form_data(self, bot: Bot, method: TelegramMethod[Any]) -> FormData:
+        reply_markup = serialized_markup(getattr(method, "reply_markup", None))
+        if reply_markup is None:
+            return super().build_form_data(bot, method)
+
+        form = FormData(quote_fields=False)
+        files: dict[str, InputFile] = {}
+        for key, value in method.model_dump(warnings=False, exclude={"reply_markup"}).items():
+            value = self.prepare_value(value, bot=bot, files=files)
+            if not value:
+                continue
+            form.add_field(key, value)
+        form.add_field("reply_markup", reply_markup)
+        for key, value in files.items():
+            form.add_field(key, value.read(bot), filename=value.filename or key)
+        return form
+
+
+def build_bot_session(config: BotApiSettings) -> BotSession:
+    api = TelegramAPIServer.from_base(config.base_url, is_local=config.local) if config.base_url else PRODUCTION
+    return BotSession(
+        api=api,
+        limit=config.connection_limit,
+        timeout=config.timeout,
+        method_timeouts=config.method_timeouts,
+        keepalive_timeout=config.keepalive_timeout,
+        dns_cache_ttl=config.dns_cache_ttl,
+        retries=config.retries,
+        retry_backoff=config.retry_backoff,
+    )
@@ -0,0 +1,148 @@
+import asyncio
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.processed_update import ProcessedUpdate
+from app.services.metrics import Counter, Histogram
+from app.utils.recent_updates import RecentUpdateWindow
+
+DUPLICATE_UPDATES = Counter(
+    "webhook_duplicate_updates_total",
+    "Updates ignored because their update_id was already processed.",
+    ["source"],
+)
+PURGED_UPDATES = Counter("processed_updates_purged_total", "Rows removed from processed_updates by retention.")
+INSERT_BATCH_SIZE = Histogram(
+    "processed_updates_insert_batch_size",
+    "Update ids written per processed_updates commit.",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+
+
+async def _insert_update_ids(update_ids: Iterable[int]) -> set[int]:
+    """Insert update ids in one statement and return the ids that were new."""
+    # Sorted ids keep concurrent batches from locking the unique index in opposite order.
+    statement = (
+        insert(ProcessedUpdate)
+        .values([{"update_id": update_id} for update_id in sorted(update_ids)])
+        .on_conflict_do_nothing(index_elements=[ProcessedUpdate.update_id])
+        .returning(ProcessedUpdate.update_id)
+    )
+    async with AsyncSessionLocal.begin() as session:
+        return set((await session.scalars(statement)).all())
+
+
+class ProcessedUpdateBatcher:
+    """Group-commits update ids submitted by concurrent webhook requests.
+
+    Ids are flushed with one multi-row insert when the batch reaches
+    ``max_size`` or ``max_delay`` seconds after its first id, and each waiting
+    request gets its own answer. A request is only released once its row is
+    committed, so the exactly-once guarantee of the table is unchanged.
+    """
+
+    def __init__(self, max_size: int, max_delay: float) -> None:
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._pending: dict[int, list[asyncio.Future[bool]]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+    async def submit(self, update_id: int) -> bool:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[bool] = loop.create_future()
+        self._pending.setdefault(update_id, []).append(future)
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    async def drain(self) -> None:
+        """Write the pending batch now and wait for every write in flight, e.g. on shutdown."""
+        self._flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.create_task(self._write(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, batch: dict[int, list[asyncio.Future[bool]]]) -> None:
+        INSERT_BATCH_SIZE.observe(len(batch))
+        try:
+            inserted = await _insert_update_ids(batch)
+        except Exception as exc:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exc)
+            return
+
+        for update_id, futures in batch.items():
+            for index, future in enumerate(futures):
+                if not future.done():
+                    # The same id can be submitted twice within one batch; only the first caller wins.
+                    future.set_result(index == 0 and update_id in inserted)
+
+
+recent_updates = RecentUpdateWindow(settings.dedup_window_size)
+update_batcher = (
+    ProcessedUpdateBatcher(
+        max_size=settings.dedup_batch_max_size,
+        max_delay=settings.dedup_batch_max_delay_ms / 1000,
+    )
+    if settings.dedup_batch_max_size > 0
+    else None
+)
+
+
+async def register_update(update_id: int) -> bool:
+    """Record an update id and return True only the first time it is seen."""
+    if update_id in recent_updates:
+        DUPLICATE_UPDATES.labels("memory").inc()
+        return False
+
+    if update_batcher is not None:
+        inserted = await update_batcher.submit(update_id)
+    else:
+        INSERT_BATCH_SIZE.observe(1)
+        inserted = update_id in await _insert_update_ids([update_id])
+
+    recent_updates.add(update_id)
+    if not inserted:
+        DUPLICATE_UPDATES.labels("database").inc()
+    return inserted
+
+
+async def purge_processed_updates(retention: timedelta, batch_size: int) -> int:
+    cutoff = datetime.now(UTC) - retention
+    purged = 0
+    while True:
+        batch = (
+            select(ProcessedUpdate.id)
+            .where(ProcessedUpdate.created_at < cutoff)
+            .order_by(ProcessedUpdate.id)
+            .limit(batch_size)
+        )
+        async with AsyncSessionLocal.begin() as session:
+            result = await session.execute(
+                delete(ProcessedUpdate)
+                .where(ProcessedUpdate.id.in_(batch.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            )
+        purged += result.rowcount
+        PURGED_UPDATES.inc(result.rowcount)
+        if result.rowcount < batch_size:
+            return purged
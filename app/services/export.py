@@ -0,0 +1,135 @@
+import logging
+from collections.abc import AsyncIterator
+from datetime import timedelta
+
+from aiogram import Bot
+from aiogram.types import InputFile
+from sqlalchemy import func, literal_column, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import AsyncSessionLocal
+from app.models.export_cursor import ExportCursor
+from app.models.lead import Lead
+from app.models.lead_archive import LeadArchive
+from app.services.metrics import Counter
+from app.services.replica import read_session
+from app.utils.export import EXPORT_FIELDS, ExportFilters, encode_csv_rows, encode_ndjson_rows
+
+logger = logging.getLogger(__name__)
+
+EXPORT_ROWS = Counter("lead_export_rows_total", "Leads streamed by exports, by format.", ["format"])
+
+# Rows fetched per round trip from the server-side cursor.
+EXPORT_CHUNK_SIZE = 1000
+# Cursor exports skip the newest leads: ids are assigned before commit, so a
+# lead still being inserted could otherwise end up below the saved cursor.
+EXPORT_CURSOR_LAG = timedelta(seconds=5)
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+class LeadExport:
+    """One export run.
+
+    :meth:`chunks` streams encoded rows from a server-side cursor, so memory
+    use does not depend on the number of leads. Incremental exports only move
+    their cursor when the caller confirms delivery with :meth:`commit_cursor`.
+    """
+
+    def __init__(self, export_format: str, filters: ExportFilters) -> None:
+        self.export_format = export_format
+        self.filters = filters
+        self.last_lead_id: int | None = None
+
+    @property
+    def media_type(self) -> str:
+        return EXPORT_MEDIA_TYPES[self.export_format]
+
+    @property
+    def filename(self) -> str:
+        return f"leads.{self.export_format}"
+
+    def _select(self, model):
+        filters = self.filters
+        statement = select(*(getattr(model, field) for field in EXPORT_FIELDS))
+        if filters.status is not None:
+            statement = statement.where(model.status == filters.status)
+        if filters.created_from is not None:
+            statement = statement.where(model.created_at >= filters.created_from)
+        if filters.created_to is not None:
+            statement = statement.where(model.created_at < filters.created_to)
+        return statement
+
+    async def _statement(self, session):
+        if self.filters.cursor is None:
+            # Full and date-range exports include leads moved to leads_archive.
+            return union_all(self._select(Lead), self._select(LeadArchive)).order_by(literal_column("id"))
+
+        # Archived leads are older than any cursor, so incremental exports stay on leads.
+        after_id = await session.scalar(
+            select(ExportCursor.last_lead_id).where(ExportCursor.name == self.filters.cursor)
+        )
+        return (
+            self._select(Lead)
+            .where(Lead.id > (after_id or 0), Lead.created_at < func.now() - EXPORT_CURSOR_LAG)
+            .order_by(Lead.id)
+        )
+
+    def _session(self):
+        # Incremental exports read their cursor and rows from the primary: on a
+        # lagging replica the saved cursor could be stale or skip rows.
+        return AsyncSessionLocal() if self.filters.cursor is not None else read_session()
+
+    async def has_rows(self) -> bool:
+        """Whether the export would contain any lead; Telegram rejects empty documents."""
+        async with self._session() as session:
+            statement = await self._statement(session)
+            return bool(await session.scalar(select(statement.exists())))
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        header = self.export_format == "csv"
+        if header:
+            yield encode_csv_rows([], header=True)
+        async with self._session() as session:
+            statement = await self._statement(session)
+            result = await session.stream(statement.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+            async for rows in result.partitions():
+                if self.export_format == "csv":
+                    yield encode_csv_rows(rows)
+                else:
+                    yield encode_ndjson_rows(rows)
+                self.last_lead_id = rows[-1].id
+                EXPORT_ROWS.labels(self.export_format).inc(len(rows))
+
+    async def commit_cursor(self) -> None:
+        if self.filters.cursor is None or self.last_lead_id is None:
+            return
+        statement = insert(ExportCursor).values(name=self.filters.cursor, last_lead_id=self.last_lead_id)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ExportCursor.name],
+            set_={
+                "last_lead_id": func.greatest(ExportCursor.last_lead_id, statement.excluded.last_lead_id),
+                "updated_at": func.now(),
+            },
+        )
+        async with AsyncSessionLocal.begin() as session:
+            await session.execute(statement)
+        logger.info("Export cursor %s moved to lead %s", self.filters.cursor, self.last_lead_id)
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """Chunks for an HTTP response; the cursor moves once the last chunk was handed over."""
+        async for chunk in self.chunks():
+            yield chunk
+        await self.commit_cursor()
+
+
+class StreamingInputFile(InputFile):
+    """Telegram upload fed from an export stream instead of an in-memory buffer."""
+
+    def __init__(self, export: LeadExport) -> None:
+        super().__init__(filename=export.filename)
+        self.export = export
+
+    async def read(self, bot: Bot) -> AsyncIterator[bytes]:
+        async for chunk in self.export.chunks():
+            yield chunk
@@ -0,0 +1,220 @@
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from sqlalchemy import case, delete, func, null, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.fsm_state import FSM_STATE_VERSION_SEQ, FsmState
+from app.services.metrics import Counter
+from app.utils.lru import LRUCache
+
+FSM_STORAGE_READS = Counter(
+    "fsm_storage_reads_total",
+    "FSM storage reads by how they were served.",
+    ["source"],
+)
+FSM_STORAGE_CONFLICTS = Counter(
+    "fsm_storage_write_conflicts_total",
+    "Form updates retried because another worker changed the state first.",
+)
+
+# Read-modify-write attempts before giving up on a form that keeps changing.
+FSM_WRITE_ATTEMPTS = 5
+
+
+@dataclass
+class _Record:
+    state: str | None
+    data: dict[str, Any]
+    version: int
+    fetched_at: float
+
+
+def _state_name(state: StateType) -> str | None:
+    return state.state if isinstance(state, State) else state
+
+
+class PostgresStorage(BaseStorage):
+    """FSM storage kept in the fsm_states table with a per-process cache.
+
+    Every write bumps the row version from a global sequence and refreshes the
+    cache from ``RETURNING``. Cached records younger than ``cache_ttl`` seconds
+    are served directly; older ones are revalidated with a query that only
+    returns the payload when the version changed. Read-modify-write updates
+    (:meth:`merge_state_and_data`, :meth:`clear_if_set`) only apply when the
+    row still has the version they read, and retry with a fresh read otherwise.
+    Clearing a form keeps an empty row so versions stay monotonic; abandoned
+    rows are removed by :func:`purge_expired_fsm_states`.
+    """
+
+    def __init__(
+        self,
+        cache_size: int = 10000,
+        cache_ttl: float = 1.0,
+        key_builder: KeyBuilder | None = None,
+    ) -> None:
+        self.cache_ttl = cache_ttl
+        self.key_builder = key_builder or DefaultKeyBuilder(with_bot_id=True, with_destiny=True)
+        self._cache: LRUCache[str, _Record] = LRUCache(cache_size)
+
+    async def _load(self, key: StorageKey, revalidate: bool = False) -> _Record:
+        storage_key = self.key_builder.build(key)
+        cached = self._cache.get(storage_key)
+        now = time.monotonic()
+        if cached is not None and not revalidate and now - cached.fetched_at < self.cache_ttl:
+            FSM_STORAGE_READS.labels("cache").inc()
+            return cached
+
+        if cached is not None:
+            unchanged = FsmState.version == cached.version
+            statement = select(
+                FsmState.version,
+                case((unchanged, null()), else_=FsmState.state).label("state"),
+                case((unchanged, null()), else_=FsmState.data).label("data"),
+            ).where(FsmState.key == storage_key)
+        else:
+            statement = select(FsmState.version, FsmState.state, FsmState.data).where(FsmState.key == storage_key)
+
+        async with AsyncSessionLocal() as session:
+            row = (await session.execute(statement)).first()
+
+        if row is None:
+            record = _Record(state=None, data={}, version=0, fetched_at=now)
+            FSM_STORAGE_READS.labels("database").inc()
+        elif cached is not None and row.version == cached.version:
+            cached.fetched_at = now
+            record = cached
+            FSM_STORAGE_READS.labels("revalidated").inc()
+        else:
+            record = _Record(state=row.state, data=dict(row.data or {}), version=row.version, fetched_at=now)
+            FSM_STORAGE_READS.labels("database").inc()
+        self._cache.put(storage_key, record)
+        return record
+
+    async def _write(self, key: StorageKey, values: dict[str, Any], expected_version: int | None = None) -> bool:
+        """Upsert ``values``; with ``expected_version`` only if the row still has that version.
+
+        Version 0 stands for "no row", which never matches an existing row.
+        Returns False when the conditional write lost to another writer.
+        """
+        storage_key = self.key_builder.build(key)
+        statement = insert(FsmState).values(
+            key=storage_key,
+            version=func.nextval(FSM_STATE_VERSION_SEQ.name),
+            **values,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[FsmState.key],
+            set_={
+                **{column: statement.excluded[column] for column in values},
+                "version": statement.excluded.version,
+                "updated_at": func.now(),
+            },
+            where=FsmState.version == expected_version if expected_version is not None else None,
+        ).returning(FsmState.state, FsmState.data, FsmState.version)
+        async with AsyncSessionLocal.begin() as session:
+            row = (await session.execute(statement)).first()
+        if row is None:
+            # The cached version is stale; the next read must go to the database.
+            self._cache.pop(storage_key)
+            return False
+        self._cache.put(
+            storage_key,
+            _Record(state=row.state, data=dict(row.data), version=row.version, fetched_at=time.monotonic()),
+        )
+        return True
+
+    async def _compare_and_set(
+        self,
+        key: StorageKey,
+        build: Callable[[_Record], dict[str, Any] | None],
+        revalidate: bool = False,
+    ) -> None:
+        """Write ``build(record)`` unless the row changed since ``record`` was read, then retry."""
+        record = await self._load(key, revalidate=revalidate)
+        for _ in range(FSM_WRITE_ATTEMPTS):
+            values = build(record)
+            if values is None or await self._write(key, values, expected_version=record.version):
+                return
+            FSM_STORAGE_CONFLICTS.inc()
+            record = await self._load(key, revalidate=True)
+        raise RuntimeError(f"FSM state {self.key_builder.build(key)} kept changing during update")
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self._write(key, {"state": _state_name(state)})
+
+    async def get_state(self, key: StorageKey) -> str | None:
+        return (await self._load(key)).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        await self._write(key, {"data": dict(data)})
+
+    async def get_data(self, key: StorageKey) -> dict[str, Any]:
+        return dict((await self._load(key)).data)
+
+    async def merge_state_and_data(self, key: StorageKey, state: StateType, data: Mapping[str, Any]) -> None:
+        """Merge ``data`` into the stored data and set ``state`` with one conditional write."""
+        state_name = _state_name(state)
+        await self._compare_and_set(key, lambda record: {"state": state_name, "data": {**record.data, **data}})
+
+    async def clear_if_set(self, key: StorageKey) -> None:
+        """Clear state and data; a form that is already empty is left without a write."""
+
+        def build(record: _Record) -> dict[str, Any] | None:
+            if record.state is None and not record.data:
+                return None
+            return {"state": None, "data": {}}
+
+        # "Already empty" must not come from a stale cache, or a cancel could be lost.
+        await self._compare_and_set(key, build, revalidate=True)
+
+    async def close(self) -> None:
+        self._cache.clear()
+
+
+async def update_form(state: FSMContext, next_state: StateType, **data: Any) -> None:
+    """Merge ``data`` into the form and move it to ``next_state`` in one write when possible."""
+    if isinstance(state.storage, PostgresStorage):
+        await state.storage.merge_state_and_data(state.key, next_state, data)
+        return
+    await state.update_data(**data)
+    await state.set_state(next_state)
+
+
+async def clear_form(state: FSMContext) -> None:
+    if isinstance(state.storage, PostgresStorage):
+        # /start and "cancel" usually hit users with no form; a revalidation read avoids a write.
+        await state.storage.clear_if_set(state.key)
+        return
+    await state.clear()
+
+
+async def purge_expired_fsm_states(ttl: timedelta, batch_size: int) -> int:
+    cutoff = datetime.now(UTC) - ttl
+    purged = 0
+    while True:
+        batch = select(FsmState.key).where(FsmState.updated_at < cutoff).limit(batch_size)
+        async with AsyncSessionLocal.begin() as session:
+            result = await session.execute(
+                delete(FsmState)
+                .where(FsmState.key.in_(batch.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            )
+        purged += result.rowcount
+        if result.rowcount < batch_size:
+            return purged
+
+
+def build_fsm_storage() -> BaseStorage:
+    if settings.fsm_storage == "memory":
+        return MemoryStorage()
+    return PostgresStorage(cache_size=settings.fsm_cache_size, cache_ttl=settings.fsm_cache_ttl)
@@ -0,0 +1,100 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.services.metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_try_advisory_lock.
+LEADER_LOCK_KEY = 728_451_903_117
+
+IS_LEADER = Gauge("leader_elected", "1 while this process holds the leader advisory lock.")
+
+
+def _forward_payload(callback: Callable[[str], None]) -> Callable[..., None]:
+    def listener(connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            callback(payload)
+        except Exception:
+            logger.exception("Listener for %s failed", channel)
+
+    return listener
+
+
+class LeaderElection:
+    """Runs cluster-wide singleton jobs in exactly one process.
+
+    Every process competes for a session-level Postgres advisory lock on a
+    dedicated connection from ``engine`` (see app.database.create_leader_engine).
+    The holder runs the registered jobs, LISTENs on the registered channels and
+    heartbeats the connection; if it dies or loses the connection, Postgres
+    releases the lock and another process takes over on its next attempt.
+    Notifications sent while no process leads are lost, so jobs must not
+    depend on them for correctness.
+    """
+
+    def __init__(self, engine: AsyncEngine, lock_key: int = LEADER_LOCK_KEY, retry_interval: float = 10.0) -> None:
+        self.engine = engine
+        self.lock_key = lock_key
+        self.retry_interval = retry_interval
+        self._jobs: list[tuple[str, Callable[[], Awaitable[None]]]] = []
+        self._listeners: list[tuple[str, Callable[[str], None]]] = []
+
+    def add_job(self, name: str, job: Callable[[], Awaitable[None]]) -> None:
+        self._jobs.append((name, job))
+
+    def add_listener(self, channel: str, callback: Callable[[str], None]) -> None:
+        """Call ``callback(payload)`` for each NOTIFY on ``channel`` while this process leads."""
+        self._listeners.append((channel, callback))
+
+    async def run(self) -> None:
+        while True:
+            try:
+                async with self.engine.connect() as connection:
+                    acquired = await connection.scalar(select(func.pg_try_advisory_lock(self.lock_key)))
+                    await connection.commit()
+                    if acquired:
+                        try:
+                            await self._lead(connection)
+                        finally:
+                            # Closing the connection is what releases the session lock;
+                            # it must never be reused while still holding it.
+                            await connection.invalidate()
+            except Exception:
+                logger.exception("Leader election attempt failed")
+            await asyncio.sleep(self.retry_interval)
+
+    async def _lead(self, connection) -> None:
+        logger.info("Acquired leader lock, starting %s jobs", len(self._jobs))
+        if self._listeners:
+            driver_connection = (await connection.get_raw_connection()).driver_connection
+            for channel, callback in self._listeners:
+                await driver_connection.add_listener(channel, _forward_payload(callback))
+        IS_LEADER.set(1)
+        tasks = [asyncio.create_task(self._supervise(name, job)) for name, job in self._jobs]
+        try:
+            while True:
+                await asyncio.sleep(self.retry_interval)
+                await connection.execute(select(1))
+                await connection.commit()
+        finally:
+            IS_LEADER.set(0)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info("Released leader lock")
+
+    async def _supervise(self, name: str, job: Callable[[], Awaitable[None]]) -> None:
+        # Jobs that return normally are done (e.g. a finished backfill); crashed ones are restarted.
+        while True:
+            try:
+                await job()
+                logger.info("Leader job %s finished", name)
+                return
+            except Exception:
+                logger.exception("Leader job %s crashed, restarting", name)
+            await asyncio.sleep(self.retry_interval)
@@ -0,0 +1,263 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import Integer, bindparam, func, insert, or_, select, text, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.lead import Lead
+from app.models.lead_archive import LeadArchive
+from app.models.stats import STATS_ROW_ID
+from app.services.notifier import build_admin_lead_notification
+from app.services.outbox import build_outbox_wakeup
+from app.services.reminders import build_lead_created_notify, reminder_scheduler
+from app.services.replica import read_session
+from app.services.rollups import build_rollup_upsert
+from app.services.stats import build_counters_update
+from app.services.users import build_user_upsert, is_known_user, remember_user
+from app.utils.logic import LeadCursor, escape_like, normalize_phone, phone_search_key
+from app.utils.rollups import COMPLETION_TIME_BUCKETS
+
+# How many earlier leads with the same phone are listed in the admin alert.
+DUPLICATE_LIMIT = 3
+
+# Each list view is a sequence of (status, newest first) segments. Every
+# segment is read with its own query on ix_leads_status_created_at_id, so a
+# page costs the same however deep it is.
+LEAD_VIEWS: dict[str, tuple[tuple[str, bool], ...]] = {
+    "all": (("new", True), ("completed", True)),
+    "new": (("new", False),),
+}
+
+
+@dataclass(frozen=True)
+class LeadPage:
+    leads: list[tuple[int, Lead]]
+    has_previous: bool
+    has_next: bool
+
+    def cursor(self, index: int) -> LeadCursor:
+        segment, lead = self.leads[index]
+        return LeadCursor(segment=segment, created_at=lead.created_at, id=lead.id)
+
+
+async def create_lead(
+    telegram_id: int,
+    username: str | None,
+    name: str,
+    phone: str,
+    service: str | None,
+    comment: str | None,
+) -> int:
+    """Store the user, the lead and its admin alert in one transaction and return the lead id."""
+    phone_normalized = normalize_phone(phone)
+    new_users = 0
+    duplicate_ids: list[int] = []
+    async with AsyncSessionLocal.begin() as session:
+        if not is_known_user(telegram_id, username):
+            new_users = int(bool(await session.scalar(build_user_upsert(telegram_id, username))))
+        if settings.duplicate_window_hours > 0 and phone_normalized:
+            duplicate_ids = list(
+                await session.scalars(
+                    select(Lead.id)
+                    .where(
+                        Lead.phone_normalized == phone_normalized,
+                        Lead.created_at >= func.now() - timedelta(hours=settings.duplicate_window_hours),
+                    )
+                    .order_by(Lead.created_at.desc())
+                    .limit(DUPLICATE_LIMIT)
+                )
+            )
+        lead_id, created_at = (
+            await session.execute(
+                insert(Lead)
+                .values(
+                    user_id=telegram_id,
+                    name=name,
+                    phone=phone,
+                    phone_normalized=phone_normalized,
+                    service=service,
+                    comment=comment,
+                )
+                .returning(Lead.id, Lead.created_at)
+            )
+        ).one()
+        await session.execute(
+            build_admin_lead_notification(
+                lead_id=lead_id,
+                name=name,
+                phone=phone,
+                service=service,
+                comment=comment,
+                username=username,
+                duplicate_ids=duplicate_ids,
+            )
+        )
+        await session.execute(build_rollup_upsert(created_at, leads_created=1))
+        await session.execute(build_counters_update(users_count=new_users, leads_total=1, leads_new=1))
+        await session.execute(build_outbox_wakeup())
+        await session.execute(build_lead_created_notify(lead_id, created_at))
+
+    remember_user(telegram_id, username)
+    return lead_id
+
+
+# Completes the selected new leads and folds them into stats_counters, the
+# rollups and the completion-time histogram in one round trip. The counters
+# update joins on the other CTEs' output so the shared counters row is locked
+# last, in the same order as create_lead.
+_COMPLETE_LEADS_SQL = """
+    WITH done AS (
+        UPDATE leads
+        SET status = 'completed', completed_at = now(), last_reminder_at = NULL
+        WHERE status = 'new' AND {condition}
+        RETURNING id, greatest(0, extract(epoch FROM now() - created_at))::bigint AS seconds
+    ), rollups AS (
+        INSERT INTO lead_rollups (period, bucket_start, leads_completed, completion_seconds)
+        SELECT p.period, date_trunc(p.period, now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC', count(*), sum(seconds)
+        FROM done
+        CROSS JOIN (VALUES ('day'), ('hour')) AS p(period)
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        ON CONFLICT (period, bucket_start) DO UPDATE
+        SET leads_completed = lead_rollups.leads_completed + excluded.leads_completed,
+            completion_seconds = lead_rollups.completion_seconds + excluded.completion_seconds
+        RETURNING 1
+    ), times AS (
+        INSERT INTO lead_completion_times (day, bucket, count)
+        SELECT
+            date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+            (SELECT count(*) FROM unnest(:bounds) AS bound WHERE bound < seconds),
+            count(*)
+        FROM done
+        GROUP BY 1, 2
+        ORDER BY 1, 2
+        ON CONFLICT (day, bucket) DO UPDATE
+        SET count = lead_completion_times.count + excluded.count
+        RETURNING 1
+    ), counters AS (
+        UPDATE stats_counters AS c
+        SET leads_new = c.leads_new - s.n, leads_completed = c.leads_completed + s.n, updated_at = now()
+        FROM (SELECT count(*) AS n FROM done) AS s,
+             (SELECT count(*) AS n FROM rollups) AS r,
+             (SELECT count(*) AS n FROM times) AS t
+        WHERE c.id = :stats_row_id AND s.n > 0 AND r.n + t.n > 0
+    )
+    SELECT id FROM done ORDER BY id
+"""
+
+
+def _complete_leads_statement(condition: str):
+    return text(_COMPLETE_LEADS_SQL.format(condition=condition)).bindparams(
+        bindparam("bounds", list(COMPLETION_TIME_BUCKETS), type_=ARRAY(Integer)),
+        bindparam("stats_row_id", STATS_ROW_ID),
+    )
+
+
+_COMPLETE_BY_IDS = _complete_leads_statement("id = ANY(:lead_ids)").bindparams(
+    bindparam("lead_ids", type_=ARRAY(Integer))
+)
+_COMPLETE_IN_RANGE = _complete_leads_statement(
+    "(created_at, id) >= (:first_created_at, :first_id) AND (created_at, id) <= (:last_created_at, :last_id)"
+)
+_COMPLETE_OLDER_THAN = _complete_leads_statement("created_at < :before")
+
+
+async def _complete_leads(statement, params: dict) -> list[int]:
+    async with AsyncSessionLocal.begin() as session:
+        lead_ids = list((await session.scalars(statement, params)).all())
+    for lead_id in lead_ids:
+        reminder_scheduler.lead_completed(lead_id)
+    return lead_ids
+
+
+async def complete_leads(lead_ids: list[int]) -> list[int]:
+    """Complete the given leads that are still new and return their ids."""
+    return await _complete_leads(_COMPLETE_BY_IDS, {"lead_ids": lead_ids})
+
+
+async def complete_leads_between(first: LeadCursor, last: LeadCursor) -> list[int]:
+    """Complete new leads whose ``(created_at, id)`` lies between two page cursors, inclusive."""
+    return await _complete_leads(
+        _COMPLETE_IN_RANGE,
+        {
+            "first_created_at": first.created_at,
+            "first_id": first.id,
+            "last_created_at": last.created_at,
+            "last_id": last.id,
+        },
+    )
+
+
+async def complete_leads_older_than(before: datetime) -> list[int]:
+    return await _complete_leads(_COMPLETE_OLDER_THAN, {"before": before})
+
+
+def _segment_query(status: str, descending: bool, forward: bool, cursor: LeadCursor | None, limit: int):
+    # Reading backwards walks the segment in the opposite direction.
+    reverse = descending == forward
+    key = tuple_(Lead.created_at, Lead.id)
+    statement = select(Lead).where(Lead.status == status)
+    if cursor is not None:
+        position = tuple_(cursor.created_at, cursor.id)
+        statement = statement.where(key < position if reverse else key > position)
+    if reverse:
+        statement = statement.order_by(Lead.created_at.desc(), Lead.id.desc())
+    else:
+        statement = statement.order_by(Lead.created_at.asc(), Lead.id.asc())
+    return statement.limit(limit)
+
+
+async def fetch_lead_page(
+    view: str,
+    page_size: int,
+    cursor: LeadCursor | None = None,
+    forward: bool = True,
+) -> LeadPage:
+    """Return the page after ``cursor`` (or before it when ``forward`` is false)."""
+    segments = LEAD_VIEWS[view]
+    if cursor is None:
+        start = 0 if forward else len(segments) - 1
+    else:
+        start = min(cursor.segment, len(segments) - 1)
+    order = range(start, len(segments)) if forward else range(start, -1, -1)
+
+    rows: list[tuple[int, Lead]] = []
+    async with read_session() as session:
+        for segment in order:
+            status, descending = segments[segment]
+            segment_cursor = cursor if cursor is not None and segment == cursor.segment else None
+            leads = await session.scalars(
+                _segment_query(status, descending, forward, segment_cursor, page_size + 1 - len(rows))
+            )
+            rows.extend((segment, lead) for lead in leads)
+            if len(rows) > page_size:
+                break
+
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if forward:
+        return LeadPage(leads=rows, has_previous=cursor is not None, has_next=more)
+    return LeadPage(leads=rows[::-1], has_previous=more, has_next=cursor is not None)
+
+
+async def find_leads(query: str, limit: int) -> list[Lead | LeadArchive]:
+    """Newest leads matching a phone number exactly, or a name/service substring, archive included."""
+    phone = phone_search_key(query)
+    pattern = f"%{escape_like(query)}%"
+    found: list[Lead | LeadArchive] = []
+    async with read_session() as session:
+        # Each table is searched through its own indexes and the results merged here.
+        for model in (Lead, LeadArchive):
+            if phone is not None:
+                condition = model.phone_normalized == phone
+            else:
+                condition = or_(model.name.ilike(pattern, escape="\\"), model.service.ilike(pattern, escape="\\"))
+            found.extend(
+                await session.scalars(
+                    select(model).where(condition).order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+                )
+            )
+    found.sort(key=lambda lead: (lead.created_at, lead.id), reverse=True)
+    return found[:limit]
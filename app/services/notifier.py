@@ -1,10 +1,11 @@
 ﻿from html import escape
 
-from aiogram import Bot
 from aiogram.enums import ParseMode
+from sqlalchemy.sql.dml import Insert
 
 from app.config import settings
-from app.keyboards.menus import get_admin_lead_keyboard
+from app.keyboards.menus import render_admin_lead_keyboard
+from app.services.outbox import build_outbox_insert
 
 
 def build_admin_lead_message(
@@ -14,6 +15,7 @@ def build_admin_lead_message(
     service: str | None,
     comment: str | None,
     username: str | None,
+    duplicate_ids: list[int] | None = None,
 ) -> str:
     safe_name = escape(name)
     safe_phone = escape(phone)
@@ -21,7 +23,7 @@ def build_admin_lead_message(
     comment_text = escape(comment.strip()) if comment and comment.strip() else "None"
     username_text = escape(f"@{username}") if username else "Not provided"
 
-    return (
+    text = (
         f"<code>{lead_id:08d}</code>\n"
         "<b>NEW LEAD</b>\n\n"
         f"<b>Name:</b> {safe_name}\n"
@@ -30,17 +32,22 @@ def build_admin_lead_message(
         f"<b>Comment:</b> {comment_text}\n"
         f"<b>Telegram:</b> {username_text}"
     )
+    if duplicate_ids:
+        previous = ", ".join(f"<code>{duplicate_id:08d}</code>" for duplicate_id in duplicate_ids)
+        text += f"\n\n<b>Possible duplicate of:</b> {previous}"
+    return text
 
 
-async def notify_admin_about_lead(
-    bot: Bot,
+def build_admin_lead_notification(
     lead_id: int,
     name: str,
     phone: str,
     service: str | None = None,
     comment: str | None = None,
     username: str | None = None,
-) -> None:
+    duplicate_ids: list[int] | None = None,
+) -> Insert:
+    """Outbox row for the admin alert; executed in the same transaction as the lead."""
     text = build_admin_lead_message(
         lead_id=lead_id,
         name=name,
@@ -48,12 +55,11 @@ async def notify_admin_about_lead(
         service=service,
         comment=comment,
         username=username,
+        duplicate_ids=duplicate_ids,
     )
-    keyboard = get_admin_lead_keyboard(phone=phone, lead_id=lead_id)
-
-    await bot.send_message(
+    return build_outbox_insert(
         chat_id=settings.admin_id,
         text=text,
-        parse_mode=ParseMode.HTML,
-        reply_markup=keyboard,
+        parse_mode=ParseMode.HTML.value,
+        reply_markup=render_admin_lead_keyboard(phone=phone, lead_id=lead_id),
     )
@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramAPIError,
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramNotFound,
+    TelegramRetryAfter,
+)
+from aiogram.types import InlineKeyboardMarkup
+from sqlalchemy import Select, delete, func, insert, select, update
+from sqlalchemy.sql.dml import Insert
+
+from app.database import AsyncSessionLocal
+from app.keyboards.serialized import markup_from_json
+from app.models.notification import NotificationOutbox
+from app.services.metrics import Counter, Gauge
+from app.utils.lru import LRUCache
+from app.utils.rate_limit import TokenBucket, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_SENT = Counter("notification_outbox_sent_total", "Outbox notifications delivered to Telegram.")
+OUTBOX_RETRIES = Counter(
+    "notification_outbox_retries_total",
+    "Outbox deliveries rescheduled for another attempt, by reason.",
+    ["reason"],
+)
+OUTBOX_FAILED = Counter("notification_outbox_failed_total", "Outbox notifications given up on.")
+OUTBOX_LAG = Gauge(
+    "notification_outbox_lag_seconds",
+    "Age of the oldest pending notification at the last dispatcher poll, including ones waiting to be retried.",
+)
+
+PERMANENT_ERRORS = (TelegramBadRequest, TelegramForbiddenError, TelegramNotFound)
+
+# The dispatcher runs on the leader; other processes wake it with a NOTIFY on this channel.
+OUTBOX_CHANNEL = "notification_outbox"
+
+_outbox_wakeup = asyncio.Event()
+
+
+def build_outbox_insert(
+    chat_id: int,
+    text: str,
+    parse_mode: str | None = None,
+    reply_markup: InlineKeyboardMarkup | str | None = None,
+) -> Insert:
+    if isinstance(reply_markup, InlineKeyboardMarkup):
+        reply_markup = reply_markup.model_dump_json(exclude_none=True)
+    return insert(NotificationOutbox).values(
+        chat_id=chat_id,
+        text=text,
+        parse_mode=parse_mode,
+        reply_markup=reply_markup,
+    )
+
+
+def build_outbox_batch_insert(chat_id: int, texts: list[str]) -> Insert:
+    return insert(NotificationOutbox).values([{"chat_id": chat_id, "text": text} for text in texts])
+
+
+def build_outbox_wakeup() -> Select:
+    """NOTIFY the dispatcher when the surrounding transaction commits."""
+    return select(func.pg_notify(OUTBOX_CHANNEL, ""))
+
+
+def wake_outbox() -> None:
+    """Tell the local dispatcher that new rows were committed."""
+    _outbox_wakeup.set()
+
+
+async def purge_sent_notifications(retention: timedelta, batch_size: int) -> int:
+    cutoff = datetime.now(UTC) - retention
+    purged = 0
+    while True:
+        batch = (
+            select(NotificationOutbox.id)
+            .where(NotificationOutbox.status != "pending", NotificationOutbox.created_at < cutoff)
+            .order_by(NotificationOutbox.id)
+            .limit(batch_size)
+        )
+        async with AsyncSessionLocal.begin() as session:
+            result = await session.execute(
+                delete(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(batch.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            )
+        purged += result.rowcount
+        if result.rowcount < batch_size:
+            return purged
+
+
+@dataclass(frozen=True)
+class _Claimed:
+    id: int
+    chat_id: int
+    text: str
+    parse_mode: str | None
+    reply_markup: str | None
+    attempts: int
+
+
+class OutboxDispatcher:
+    """Delivers notification_outbox rows while respecting Telegram rate limits.
+
+    Rows are claimed with ``FOR UPDATE SKIP LOCKED`` and leased by moving
+    ``next_attempt_at`` forward, so no transaction stays open while messages
+    are being sent. The rate limits are kept in memory, so only one dispatcher
+    may run in the cluster: it is a leader job.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        batch_size: int,
+        global_rate: float,
+        per_chat_rate: float,
+        max_attempts: int,
+        lease_seconds: float = 120.0,
+        poll_interval: float = 5.0,
+    ) -> None:
+        self.bot = bot
+        self.batch_size = batch_size
+        self.per_chat_rate = per_chat_rate
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._global_bucket = TokenBucket(global_rate, capacity=global_rate, now=time.monotonic())
+        self._chat_buckets: LRUCache[int, TokenBucket] = LRUCache(capacity=1000)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                delivered = await self.dispatch_once()
+            except Exception:
+                logger.exception("Outbox dispatch failed")
+                delivered = 0
+            if delivered < self.batch_size:
+                _outbox_wakeup.clear()
+                try:
+                    await asyncio.wait_for(_outbox_wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def dispatch_once(self) -> int:
+        rows = await self._claim()
+        if not rows:
+            return 0
+
+        sent_ids: list[int] = []
+        for index, row in enumerate(rows):
+            await self._acquire(row.chat_id)
+            try:
+                await self.bot.send_message(
+                    chat_id=row.chat_id,
+                    text=row.text,
+                    parse_mode=row.parse_mode,
+                    reply_markup=markup_from_json(row.reply_markup) if row.reply_markup else None,
+                )
+            except TelegramRetryAfter as exc:
+                # Flood control applies to the whole bot, so put the rest of the batch back as well.
+                self._global_bucket.pause(time.monotonic(), exc.retry_after)
+                OUTBOX_RETRIES.labels("retry_after").inc(len(rows) - index)
+                await self._reschedule([item.id for item in rows[index:]], exc.retry_after, str(exc), count_attempt=False)
+                break
+            except PERMANENT_ERRORS as exc:
+                OUTBOX_FAILED.inc()
+                await self._mark_failed(row.id, str(exc))
+            except TelegramAPIError as exc:
+                await self._retry(row, str(exc), reason="api_error")
+            except Exception as exc:
+                await self._retry(row, f"{type(exc).__name__}: {exc}", reason="error")
+            else:
+                sent_ids.append(row.id)
+
+        if sent_ids:
+            async with AsyncSessionLocal.begin() as session:
+                await session.execute(
+                    update(NotificationOutbox)
+                    .where(NotificationOutbox.id.in_(sent_ids))
+                    .values(status="sent", sent_at=func.now(), last_error=None)
+                )
+            OUTBOX_SENT.inc(len(sent_ids))
+        return len(sent_ids)
+
+    async def _claim(self) -> list[_Claimed]:
+        due = (
+            select(NotificationOutbox.id)
+            .where(NotificationOutbox.status == "pending", NotificationOutbox.next_attempt_at <= func.now())
+            .order_by(NotificationOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        statement = (
+            update(NotificationOutbox)
+            .where(NotificationOutbox.id.in_(due.scalar_subquery()))
+            .values(next_attempt_at=func.now() + timedelta(seconds=self.lease_seconds))
+            .returning(
+                NotificationOutbox.id,
+                NotificationOutbox.chat_id,
+                NotificationOutbox.text,
+                NotificationOutbox.parse_mode,
+                NotificationOutbox.reply_markup,
+                NotificationOutbox.attempts,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        async with AsyncSessionLocal.begin() as session:
+            rows = (await session.execute(statement)).all()
+            # Rows waiting out a backoff are not claimed, but they are still a backlog.
+            oldest = await session.scalar(
+                select(func.min(NotificationOutbox.created_at)).where(NotificationOutbox.status == "pending")
+            )
+        OUTBOX_LAG.set((datetime.now(UTC) - oldest).total_seconds() if oldest is not None else 0)
+        return sorted((_Claimed(*row) for row in rows), key=lambda row: row.id)
+
+    async def _acquire(self, chat_id: int) -> None:
+        chat_bucket = self._chat_buckets.get(chat_id)
+        if chat_bucket is None:
+            chat_bucket = TokenBucket(self.per_chat_rate, capacity=1, now=time.monotonic())
+            self._chat_buckets.put(chat_id, chat_bucket)
+
+        while True:
+            now = time.monotonic()
+            wait = max(self._global_bucket.delay(now), chat_bucket.delay(now))
+            if wait <= 0:
+                self._global_bucket.consume(now)
+                chat_bucket.consume(now)
+                return
+            await asyncio.sleep(wait)
+
+    async def _retry(self, row: _Claimed, error: str, reason: str) -> None:
+        attempts = row.attempts + 1
+        if attempts >= self.max_attempts:
+            OUTBOX_FAILED.inc()
+            logger.error("Giving up on outbox notification %s after %s attempts: %s", row.id, attempts, error)
+            await self._mark_failed(row.id, error)
+            return
+        OUTBOX_RETRIES.labels(reason).inc()
+        await self._reschedule([row.id], backoff_delay(attempts, base=5.0, cap=900.0), error)
+
+    async def _reschedule(self, ids: list[int], delay: float, error: str, count_attempt: bool = True) -> None:
+        values = {
+            "next_attempt_at": func.now() + timedelta(seconds=delay),
+            "last_error": error,
+        }
+        if count_attempt:
+            values["attempts"] = NotificationOutbox.attempts + 1
+        async with AsyncSessionLocal.begin() as session:
+            await session.execute(
+                update(NotificationOutbox).where(NotificationOutbox.id.in_(ids)).values(**values)
+            )
+
+    async def _mark_failed(self, outbox_id: int, error: str) -> None:
+        async with AsyncSessionLocal.begin() as session:
+            await session.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id == outbox_id)
+                .values(status="failed", attempts=NotificationOutbox.attempts + 1, last_error=error)
+            )
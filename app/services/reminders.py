@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import time
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import Integer, Select, any_, bindparam, func, or_, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.lead import Lead
+from app.services.outbox import build_outbox_batch_insert, wake_outbox
+from app.services.rollups import build_rollup_upsert
+from app.utils.deadlines import DeadlineHeap
+from app.utils.logic import group_lines, time_ago_text
+
+logger = logging.getLogger(__name__)
+
+STALE_AFTER_HOURS = 1
+REMINDER_REPEAT_HOURS = 3
+TELEGRAM_MESSAGE_LIMIT = 4096
+# Retry window for leads that were due but not picked up, e.g. locked by another process.
+DUE_RETRY_SECONDS = 60
+# The scheduler runs on the leader; create_lead tells it about new leads with a NOTIFY here.
+REMINDER_CHANNEL = "lead_reminders"
+
+
+def _build_reminder_texts(overdue_leads: list) -> list[str]:
+    lines = [
+        f"{idx}. #{lead.id} {lead.name}: ожидает {time_ago_text(lead.created_at)}"
+        for idx, lead in enumerate(overdue_leads, start=1)
+    ]
+    header = f"Просроченные заявки ({len(overdue_leads)}):"
+    return [
+        "\n".join([header, *group])
+        for group in group_lines(lines, TELEGRAM_MESSAGE_LIMIT - len(header) - 1)
+    ]
+
+
+async def queue_stale_lead_reminders() -> list[int]:
+    """Queue reminders for overdue leads and return the ids that were reminded.
+
+    Messages go through the notification outbox, so the reminder state and the
+    outgoing messages are committed together and no connection is held while
+    Telegram is being called.
+    """
+    now = datetime.now(UTC)
+    stale_cutoff = now - timedelta(hours=STALE_AFTER_HOURS)
+    repeat_cutoff = now - timedelta(hours=REMINDER_REPEAT_HOURS)
+
+    async with AsyncSessionLocal.begin() as session:
+        overdue_leads = (
+            await session.execute(
+                select(Lead.id, Lead.name, Lead.created_at)
+                .where(
+                    Lead.status == "new",
+                    Lead.created_at <= stale_cutoff,
+                    or_(Lead.last_reminder_at.is_(None), Lead.last_reminder_at <= repeat_cutoff),
+                )
+                .order_by(Lead.created_at.asc())
+                .with_for_update(skip_locked=True)
+            )
+        ).all()
+        if not overdue_leads:
+            return []
+
+        if settings.reminder_digest:
+            texts = _build_reminder_texts(overdue_leads)
+        else:
+            texts = [
+                f"Просроченная заявка от {lead.name}: ожидает {time_ago_text(lead.created_at)}."
+                for lead in overdue_leads
+            ]
+        lead_ids = [lead.id for lead in overdue_leads]
+
+        await session.execute(build_outbox_batch_insert(settings.admin_id, texts))
+        await session.execute(
+            update(Lead)
+            .where(Lead.id == any_(bindparam("lead_ids", lead_ids, type_=ARRAY(Integer))))
+            .values(last_reminder_at=now, reminder_count=Lead.reminder_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(build_rollup_upsert(now, reminders_sent=len(lead_ids)))
+
+    wake_outbox()
+    return lead_ids
+
+
+def _next_due(created_at: datetime, last_reminder_at: datetime | None) -> float:
+    due = created_at + timedelta(hours=STALE_AFTER_HOURS)
+    if last_reminder_at is not None:
+        due = max(due, last_reminder_at + timedelta(hours=REMINDER_REPEAT_HOURS))
+    return due.timestamp()
+
+
+def build_lead_created_notify(lead_id: int, created_at: datetime) -> Select:
+    """NOTIFY the scheduler about a new lead when the surrounding transaction commits."""
+    return select(func.pg_notify(REMINDER_CHANNEL, f"{lead_id}:{created_at.timestamp()}"))
+
+
+async def fetch_reminder_deadlines(lead_ids: list[int] | None = None) -> list[tuple[int, float]]:
+    """Return ``(lead_id, next reminder time)`` for open leads, optionally only the given ones."""
+    statement = select(Lead.id, Lead.created_at, Lead.last_reminder_at).where(Lead.status == "new")
+    if lead_ids is not None:
+        statement = statement.where(Lead.id == any_(bindparam("lead_ids", lead_ids, type_=ARRAY(Integer))))
+    async with AsyncSessionLocal() as session:
+        rows = (await session.execute(statement)).all()
+    return [(lead_id, _next_due(created_at, last_reminder_at)) for lead_id, created_at, last_reminder_at in rows]
+
+
+class ReminderScheduler:
+    """Sleeps until the earliest reminder deadline instead of polling.
+
+    Deadlines of open leads are kept in a min-heap on the leader. Leads
+    created by any process reach it through a NOTIFY on REMINDER_CHANNEL.
+    Leads completed elsewhere stay in the heap until they come due; then one
+    query re-reads the due leads that got no reminder, dropping the closed
+    ones and moving the rest to their real deadline. A periodic resync
+    rebuilds the heap in case a notification was missed, e.g. while no
+    process held the leader lock.
+    """
+
+    def __init__(self, resync_interval: float) -> None:
+        self.resync_interval = resync_interval
+        self._deadlines = DeadlineHeap()
+        self._wakeup = asyncio.Event()
+        self._running = False
+        self._synced_at = float("-inf")
+
+    def lead_created(self, lead_id: int, created_at: datetime) -> None:
+        # Only the process running the scheduler (the leader) tracks deadlines.
+        if not self._running:
+            return
+        self._deadlines.schedule(lead_id, _next_due(created_at, None))
+        self._wakeup.set()
+
+    def lead_notified(self, payload: str) -> None:
+        lead_id, created_at = payload.split(":")
+        self.lead_created(int(lead_id), datetime.fromtimestamp(float(created_at), UTC))
+
+    def lead_completed(self, lead_id: int) -> None:
+        self._deadlines.cancel(lead_id)
+
+    async def _resync(self) -> None:
+        deadlines = await fetch_reminder_deadlines()
+        self._deadlines.clear()
+        for lead_id, deadline in deadlines:
+            self._deadlines.schedule(lead_id, deadline)
+
+    async def run(self) -> None:
+        self._running = True
+        try:
+            await self._run()
+        finally:
+            self._running = False
+            self._deadlines.clear()
+
+    async def _tick(self) -> float:
+        """Resync if due, remind the due leads and return the seconds until the next wakeup."""
+        if time.monotonic() - self._synced_at >= self.resync_interval:
+            await self._resync()
+            self._synced_at = time.monotonic()
+
+        now = time.time()
+        due = self._deadlines.pop_due(now)
+        if due:
+            reminded = set(await queue_stale_lead_reminders())
+            for lead_id in reminded:
+                self._deadlines.schedule(lead_id, now + REMINDER_REPEAT_HOURS * 3600)
+            missed = [lead_id for lead_id in due if lead_id not in reminded]
+            if missed:
+                for lead_id, deadline in await fetch_reminder_deadlines(missed):
+                    self._deadlines.schedule(lead_id, max(deadline, now + DUE_RETRY_SECONDS))
+
+        timeout = self.resync_interval - (time.monotonic() - self._synced_at)
+        next_deadline = self._deadlines.next_deadline()
+        if next_deadline is not None:
+            timeout = min(timeout, next_deadline - time.time())
+        return max(timeout, 0)
+
+    async def _run(self) -> None:
+        self._synced_at = float("-inf")
+        while True:
+            self._wakeup.clear()
+            try:
+                timeout = await self._tick()
+            except Exception:
+                logger.exception("Reminder scheduler iteration failed")
+                await asyncio.sleep(DUE_RETRY_SECONDS)
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+reminder_scheduler = ReminderScheduler(resync_interval=settings.reminder_resync_minutes * 60)
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal, ReplicaSessionLocal, replica_engine
+from app.services.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+REPLICA_LAG = Gauge("db_replica_lag_seconds", "Replication lag measured by the last replica health check.")
+REPLICA_HEALTHY = Gauge("db_replica_healthy", "1 while read-only queries are routed to the replica.")
+READ_SESSIONS = Counter("db_read_sessions_total", "Read-only sessions by the database they were routed to.", ["target"])
+
+# A replica whose WAL receiver is not streaming (primary unreachable,
+# replication slot gone) replays everything it has and then looks lag-free,
+# so it only counts as healthy while a receiver is streaming. Roles without
+# pg_read_all_stats see the receiver row but a NULL status. Lag is zero when
+# everything received was replayed, so an idle primary does not look like
+# lag; on a server that is not in recovery both checks pass.
+_HEALTH_SQL = text(
+    """
+    SELECT
+        NOT pg_is_in_recovery() OR EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver WHERE status IS NULL OR status = 'streaming'
+        ) AS streaming,
+        CASE
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp())
+        END AS lag
+    """
+)
+
+
+class ReplicaMonitor:
+    """Periodically checks the replica and decides whether reads may use it."""
+
+    def __init__(self, max_lag: float, interval: float) -> None:
+        self.max_lag = max_lag
+        self.interval = interval
+        self.healthy = False
+
+    def _set_healthy(self, healthy: bool) -> None:
+        if healthy and not self.healthy:
+            logger.info("Read replica is healthy, routing read-only queries to it")
+        elif self.healthy and not healthy:
+            logger.warning("Read replica unavailable or lagging, reading from the primary")
+        self.healthy = healthy
+        REPLICA_HEALTHY.set(1 if healthy else 0)
+
+    async def check(self) -> None:
+        try:
+            async with replica_engine.connect() as connection:
+                row = (await connection.execute(_HEALTH_SQL)).one()
+        except Exception:
+            logger.debug("Replica health check failed", exc_info=True)
+            self._set_healthy(False)
+            return
+        lag = float(row.lag or 0)
+        REPLICA_LAG.set(lag)
+        if not row.streaming:
+            logger.debug("Replica WAL receiver is not streaming")
+        self._set_healthy(bool(row.streaming) and lag <= self.max_lag)
+
+    async def run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+
+replica_monitor = (
+    ReplicaMonitor(max_lag=settings.replica_max_lag_seconds, interval=settings.replica_check_interval)
+    if replica_engine is not None
+    else None
+)
+
+
+def read_session() -> AsyncSession:
+    """Session for read-only queries: the replica while it is healthy, otherwise the primary.
+
+    Never use it for writes or for reads that must see the caller's own writes.
+    """
+    if replica_monitor is not None and replica_monitor.healthy:
+        READ_SESSIONS.labels("replica").inc()
+        return ReplicaSessionLocal()
+    READ_SESSIONS.labels("primary").inc()
+    return AsyncSessionLocal()
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import Insert, insert
+
+from app.database import AsyncSessionLocal
+from app.models.rollup import ROLLUP_BACKFILL_ROW_ID, LeadCompletionTime, LeadRollup, LeadRollupBackfill
+from app.services.replica import read_session
+from app.utils.rollups import ROLLUP_PERIODS, bucket_start, median_bucket
+
+logger = logging.getLogger(__name__)
+
+PERIOD_STEPS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+# Pause between backfill chunks so live writers to the same rollup rows are not starved.
+BACKFILL_PAUSE_SECONDS = 0.5
+
+_BACKFILL_CHUNK_SQL = text(
+    """
+    INSERT INTO lead_rollups (period, bucket_start, leads_created)
+    SELECT p.period, date_trunc(p.period, l.created_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC', count(*)
+    FROM leads AS l
+    CROSS JOIN (VALUES ('day'), ('hour')) AS p(period)
+    WHERE l.id > :after_id AND l.id <= :up_to_id
+    GROUP BY 1, 2
+    ORDER BY 1, 2
+    ON CONFLICT (period, bucket_start) DO UPDATE
+    SET leads_created = lead_rollups.leads_created + excluded.leads_created
+    """
+)
+
+
+@dataclass(frozen=True)
+class RollupBucket:
+    bucket_start: datetime
+    leads_created: int = 0
+    leads_completed: int = 0
+    completion_seconds: int = 0
+    reminders_sent: int = 0
+
+
+def build_rollup_upsert(at: datetime, **deltas: int) -> Insert:
+    """Add ``deltas`` to the hourly and daily rollups containing ``at``."""
+    statement = insert(LeadRollup).values(
+        [{"period": period, "bucket_start": bucket_start(at, period), **deltas} for period in ROLLUP_PERIODS]
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[LeadRollup.period, LeadRollup.bucket_start],
+        set_={name: getattr(LeadRollup, name) + statement.excluded[name] for name in deltas},
+    )
+
+
+async def get_lead_trend(period: str, count: int) -> tuple[list[RollupBucket], int | None]:
+    """Return the last ``count`` buckets of ``period`` (oldest first) and the median completion bucket."""
+    step = PERIOD_STEPS[period]
+    last = bucket_start(datetime.now(UTC), period)
+    first = last - step * (count - 1)
+
+    async with read_session() as session:
+        rows = (
+            await session.execute(
+                select(
+                    LeadRollup.bucket_start,
+                    LeadRollup.leads_created,
+                    LeadRollup.leads_completed,
+                    LeadRollup.completion_seconds,
+                    LeadRollup.reminders_sent,
+                ).where(LeadRollup.period == period, LeadRollup.bucket_start >= first)
+            )
+        ).all()
+        histogram = (
+            await session.execute(
+                select(LeadCompletionTime.bucket, func.sum(LeadCompletionTime.count))
+                .where(LeadCompletionTime.day >= bucket_start(first, "day"))
+                .group_by(LeadCompletionTime.bucket)
+            )
+        ).all()
+
+    by_start = {row.bucket_start.astimezone(UTC): RollupBucket(*row) for row in rows}
+    buckets = [
+        by_start.get(first + step * index, RollupBucket(first + step * index)) for index in range(count)
+    ]
+    return buckets, median_bucket({bucket: int(total) for bucket, total in histogram})
+
+
+async def backfill_lead_rollups(batch_size: int) -> None:
+    """Fold leads created before rollups were maintained into them, one id range per transaction.
+
+    The range ends at the highest lead id seen by the migration; later leads
+    are counted when they are created. Completion times were not recorded
+    before, so only lead volume is backfilled.
+    """
+    while True:
+        async with AsyncSessionLocal.begin() as session:
+            progress = await session.get(LeadRollupBackfill, ROLLUP_BACKFILL_ROW_ID, with_for_update=True)
+            if progress is None or progress.finished_at is not None:
+                return
+            after_id = progress.last_lead_id
+            up_to_id = min(after_id + batch_size, progress.max_lead_id)
+            await session.execute(_BACKFILL_CHUNK_SQL, {"after_id": after_id, "up_to_id": up_to_id})
+            progress.last_lead_id = up_to_id
+            progress.updated_at = func.now()
+            finished = up_to_id >= progress.max_lead_id
+            if finished:
+                progress.finished_at = func.now()
+
+        if finished:
+            logger.info("Lead rollup backfill finished at lead id %s", up_to_id)
+            return
+        await asyncio.sleep(BACKFILL_PAUSE_SECONDS)
@@ -0,0 +1,93 @@
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.sql.dml import Update
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.stats import STATS_ROW_ID, StatsCounters
+from app.services.replica import read_session
+
+
+@dataclass(frozen=True)
+class StatsSnapshot:
+    users_count: int
+    leads_total: int
+    leads_new: int
+    leads_completed: int
+
+
+_cached: tuple[float, StatsSnapshot] | None = None
+
+_RECONCILE_SQL = text(
+    """
+    UPDATE stats_counters AS c
+    SET users_count = s.users_count,
+        leads_total = s.leads_total,
+        leads_new = s.leads_new,
+        leads_completed = s.leads_completed,
+        updated_at = now()
+    FROM (
+        SELECT
+            (SELECT count(*) FROM users) AS users_count,
+            count(*) AS leads_total,
+            count(*) FILTER (WHERE status = 'new') AS leads_new,
+            count(*) FILTER (WHERE status = 'completed') AS leads_completed
+        FROM (
+            SELECT status FROM leads
+            UNION ALL
+            SELECT status FROM leads_archive
+        ) AS all_leads
+    ) AS s
+    WHERE c.id = :row_id
+    RETURNING c.users_count, c.leads_total, c.leads_new, c.leads_completed
+    """
+)
+
+
+def build_counters_update(**deltas: int) -> Update:
+    """Counter increments to run inside the transaction that changes users or leads.
+
+    All writers touch the same row, so keep this as the last statement of the
+    transaction to hold its row lock for as short a time as possible.
+    """
+    values = {name: getattr(StatsCounters, name) + delta for name, delta in deltas.items()}
+    return (
+        update(StatsCounters)
+        .where(StatsCounters.id == STATS_ROW_ID)
+        .values(**values, updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def get_stats() -> StatsSnapshot:
+    global _cached
+    now = time.monotonic()
+    if _cached is not None and now - _cached[0] < settings.stats_cache_ttl:
+        return _cached[1]
+
+    async with read_session() as session:
+        row = (
+            await session.execute(
+                select(
+                    StatsCounters.users_count,
+                    StatsCounters.leads_total,
+                    StatsCounters.leads_new,
+                    StatsCounters.leads_completed,
+                ).where(StatsCounters.id == STATS_ROW_ID)
+            )
+        ).first()
+    snapshot = StatsSnapshot(*row) if row else StatsSnapshot(0, 0, 0, 0)
+    _cached = (now, snapshot)
+    return snapshot
+
+
+async def reconcile_stats() -> StatsSnapshot:
+    """Recompute the counters from the source tables with one statement."""
+    global _cached
+    async with AsyncSessionLocal.begin() as session:
+        row = (await session.execute(_RECONCILE_SQL, {"row_id": STATS_ROW_ID})).one()
+    snapshot = StatsSnapshot(*row)
+    _cached = (time.monotonic(), snapshot)
+    return snapshot
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import time
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiogram.types.update import UpdateTypeLookupError
+
+from app.services.metrics import Counter, Gauge, Histogram
+from app.services.webhook_reply import call_handler_result
+
+logger = logging.getLogger(__name__)
+
+UPDATE_QUEUE_DEPTH = Gauge("update_queue_depth", "Updates waiting in the in-process queue.")
+UPDATE_QUEUE_WAIT = Histogram(
+    "update_queue_wait_seconds",
+    "Time between enqueueing an update and a worker picking it up.",
+)
+UPDATES_PROCESSED = Counter("update_queue_processed_total", "Updates fed to the dispatcher by queue workers.")
+UPDATES_FAILED = Counter("update_queue_failed_total", "Queued updates whose handlers raised.")
+
+
+def update_chat_key(update: Update) -> int:
+    try:
+        event = update.event
+    except UpdateTypeLookupError:
+        return update.update_id
+
+    chat = getattr(event, "chat", None)
+    if chat is not None:
+        return chat.id
+    user = getattr(event, "from_user", None) or getattr(event, "user", None)
+    if user is not None:
+        return user.id
+    return update.update_id
+
+
+class UpdateQueue:
+    """Bounded queue that feeds updates to the dispatcher outside the webhook request.
+
+    Updates are sharded by chat, so one chat is always served by the same worker
+    and keeps its order while different chats are processed in parallel.
+    """
+
+    def __init__(self, workers: int, maxsize: int) -> None:
+        shard_size = max(1, maxsize // workers)
+        self._queues: list[asyncio.Queue[tuple[float, Update]]] = [
+            asyncio.Queue(maxsize=shard_size) for _ in range(workers)
+        ]
+        self._workers: list[asyncio.Task] = []
+        UPDATE_QUEUE_DEPTH.set_function(self.qsize)
+
+    def qsize(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    def start(self, bot: Bot, dispatcher: Dispatcher) -> None:
+        self._workers = [
+            asyncio.create_task(self._worker(queue, bot, dispatcher)) for queue in self._queues
+        ]
+
+    async def put(self, update: Update) -> None:
+        queue = self._queues[update_chat_key(update) % len(self._queues)]
+        # When the shard is full this waits, which pushes back on Telegram
+        # instead of dropping an update that is already marked as processed.
+        await queue.put((time.monotonic(), update))
+
+    async def _worker(self, queue: asyncio.Queue[tuple[float, Update]], bot: Bot, dispatcher: Dispatcher) -> None:
+        while True:
+            enqueued_at, update = await queue.get()
+            UPDATE_QUEUE_WAIT.observe(time.monotonic() - enqueued_at)
+            try:
+                # The webhook was acknowledged already, so calls returned by handlers are sent here.
+                await call_handler_result(bot, await dispatcher.feed_update(bot, update))
+                UPDATES_PROCESSED.inc()
+            except Exception:
+                UPDATES_FAILED.inc()
+                logger.exception("Failed to process update %s", update.update_id)
+            finally:
+                queue.task_done()
+
+    async def drain(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Update queue drain timed out with %s updates pending", self.qsize())
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
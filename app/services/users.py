@@ -0,0 +1,54 @@
+from sqlalchemy import Boolean, literal_column
+from sqlalchemy.dialects.postgresql import Insert, insert
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.user import User
+from app.services.metrics import Counter, Gauge
+from app.services.stats import build_counters_update
+from app.utils.lru import LRUCache
+
+KNOWN_USER_LOOKUPS = Counter(
+    "known_user_cache_lookups_total",
+    "Known-user cache lookups by result.",
+    ["result"],
+)
+KNOWN_USER_CACHE_SIZE = Gauge("known_user_cache_size", "Telegram ids held in the known-user cache.")
+
+_MISSING = object()
+
+# telegram_id -> last username written to the database
+known_users: LRUCache[int, str | None] = LRUCache(settings.known_user_cache_size)
+KNOWN_USER_CACHE_SIZE.set_function(lambda: len(known_users))
+
+
+def is_known_user(telegram_id: int, username: str | None) -> bool:
+    if known_users.get(telegram_id, _MISSING) == username:
+        KNOWN_USER_LOOKUPS.labels("hit").inc()
+        return True
+    KNOWN_USER_LOOKUPS.labels("miss").inc()
+    return False
+
+
+def remember_user(telegram_id: int, username: str | None) -> None:
+    known_users.put(telegram_id, username)
+
+
+def build_user_upsert(telegram_id: int, username: str | None) -> Insert:
+    """Upsert returning ``inserted`` (true for a new row); no row when nothing changed."""
+    statement = insert(User).values(telegram_id=telegram_id, username=username)
+    return statement.on_conflict_do_update(
+        index_elements=[User.telegram_id],
+        set_={"username": statement.excluded.username},
+        where=User.username.is_distinct_from(statement.excluded.username),
+    ).returning(literal_column("xmax = 0", Boolean).label("inserted"))
+
+
+async def ensure_user(telegram_id: int, username: str | None) -> None:
+    if is_known_user(telegram_id, username):
+        return
+
+    async with AsyncSessionLocal.begin() as session:
+        if await session.scalar(build_user_upsert(telegram_id, username)):
+            await session.execute(build_counters_update(users_count=1))
+    remember_user(telegram_id, username)
@@ -0,0 +1,40 @@
+from typing import Any
+
+from aiogram import Bot
+from aiogram.methods import TelegramMethod
+
+from app.keyboards.serialized import serialized_markup
+from app.services.metrics import Counter
+
+WEBHOOK_REPLY_CALLS = Counter(
+    "webhook_reply_calls_total",
+    "Bot API calls answered in the webhook response instead of an outbound request.",
+    ["method"],
+)
+
+
+def build_webhook_reply(bot: Bot, method: TelegramMethod[Any]) -> bytes | None:
+    """Serialize ``method`` as a webhook response body, or return None if it needs a file upload.
+
+    Telegram executes one method passed back in the webhook response but never
+    reports its result, so only calls whose result the handler ignores should
+    be returned from handlers.
+    """
+    files: dict[str, Any] = {}
+    reply_markup = serialized_markup(getattr(method, "reply_markup", None))
+    exclude = {"reply_markup"} if reply_markup is not None else None
+    params = bot.session.prepare_value(
+        method.model_dump(warnings=False, exclude=exclude), bot=bot, files=files, _dumps_json=False
+    )
+    if files:
+        return None
+    if reply_markup is not None:
+        # The Bot API also accepts reply_markup as a JSON-serialized string.
+        params["reply_markup"] = reply_markup
+    return bot.session.json_dumps({"method": method.__api_method__, **params}).encode()
+
+
+async def call_handler_result(bot: Bot, result: Any) -> None:
+    """Send a Bot API call returned by a handler through the normal session."""
+    if isinstance(result, TelegramMethod):
+        await bot(result)
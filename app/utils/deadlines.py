@@ -0,0 +1,43 @@
+from heapq import heappop, heappush
+
+
+class DeadlineHeap:
+    """Min-heap of per-key deadlines with lazy cancellation.
+
+    Rescheduling a key simply pushes a new entry; outdated entries are
+    skipped when they reach the top of the heap.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int]] = []
+        self._deadlines: dict[int, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(self, key: int, deadline: float) -> None:
+        self._deadlines[key] = deadline
+        heappush(self._heap, (deadline, key))
+
+    def cancel(self, key: int) -> None:
+        self._deadlines.pop(key, None)
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._deadlines.clear()
+
+    def _drop_outdated(self) -> None:
+        while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+            heappop(self._heap)
+
+    def next_deadline(self) -> float | None:
+        self._drop_outdated()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> list[int]:
+        due: list[int] = []
+        while (deadline := self.next_deadline()) is not None and deadline <= now:
+            _, key = heappop(self._heap)
+            del self._deadlines[key]
+            due.append(key)
+        return due
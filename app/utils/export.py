@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
+from typing import Any
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_STATUSES = ("new", "completed")
+EXPORT_FIELDS = (
+    "id",
+    "created_at",
+    "status",
+    "name",
+    "phone",
+    "phone_normalized",
+    "service",
+    "comment",
+    "user_id",
+    "completed_at",
+)
+EXPORT_CURSOR_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+# Spreadsheets evaluate cells starting with these as formulas.
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+@dataclass(frozen=True)
+class ExportFilters:
+    status: str | None = None
+    created_from: datetime | None = None
+    created_to: datetime | None = None
+    # Named incremental cursor: only leads newer than the last export under this name.
+    cursor: str | None = None
+
+
+def _json_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _csv_value(value: Any) -> Any:
+    # Text typed by users (name, phone, comment) must not run as a formula
+    # when the export is opened in a spreadsheet.
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return f"'{value}"
+    return _json_value(value)
+
+
+def encode_csv_rows(rows: Sequence[Sequence[Any]], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def encode_ndjson_rows(rows: Sequence[Sequence[Any]]) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, map(_json_value, row))), ensure_ascii=False) + "\n" for row in rows
+    ).encode()
+
+
+def _parse_day(raw: str) -> datetime:
+    return datetime.combine(date.fromisoformat(raw), time(), tzinfo=UTC)
+
+
+def parse_export_args(args: str | None) -> tuple[str, ExportFilters] | None:
+    """Parse ``/export`` arguments: ``csv|ndjson``, ``new|completed``, ``from=``/``to=`` days, ``cursor=``.
+
+    ``to`` is inclusive. Returns None when an argument is not understood.
+    """
+    export_format = "csv"
+    values: dict[str, Any] = {}
+    for token in (args or "").split():
+        key, _, raw = token.partition("=")
+        try:
+            if token in EXPORT_FORMATS:
+                export_format = token
+            elif token in EXPORT_STATUSES:
+                values["status"] = token
+            elif key == "from" and raw:
+                values["created_from"] = _parse_day(raw)
+            elif key == "to" and raw:
+                values["created_to"] = _parse_day(raw) + timedelta(days=1)
+            elif key == "cursor" and EXPORT_CURSOR_RE.fullmatch(raw):
+                values["cursor"] = raw
+            else:
+                return None
+        except ValueError:
+            return None
+    return export_format, ExportFilters(**values)
@@ -1,8 +1,27 @@
+import re
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+
+# Telegram serializes update_id as the first key of every update.
+_UPDATE_ID_PREFIX_RE = re.compile(rb'\A\s*\{\s*"update_id"\s*:\s*(\d+)\s*[,}]')
+
+
 def extract_update_id(payload: dict) -> int | None:
     update_id = payload.get("update_id")
     return update_id if isinstance(update_id, int) else None
 
 
+def extract_update_id_from_body(body: bytes) -> int | None:
+    """Read update_id from the start of a raw update without decoding the JSON.
+
+    Returns None when the body does not start with it; callers then fall back
+    to a full decode.
+    """
+    match = _UPDATE_ID_PREFIX_RE.match(body)
+    return int(match.group(1)) if match else None
+
+
 def parse_lead_id_from_callback(data: str | None) -> int | None:
     if not data or ":" not in data:
         return None
@@ -13,6 +32,9 @@ def parse_lead_id_from_callback(data: str | None) -> int | None:
         return None
 
 
+_PHONE_QUERY_RE = re.compile(r"\+\d{5,}")
+
+
 def normalize_phone(phone: str) -> str:
     cleaned = (
         phone.strip()
@@ -24,3 +46,99 @@ def normalize_phone(phone: str) -> str:
     if cleaned and not cleaned.startswith("+"):
         cleaned = f"+{cleaned}"
     return cleaned
+
+
+def phone_search_key(query: str) -> str | None:
+    """Normalized phone if ``query`` looks like a phone number, otherwise None."""
+    normalized = normalize_phone(query)
+    return normalized if _PHONE_QUERY_RE.fullmatch(normalized) else None
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def group_lines(lines: list[str], limit: int) -> list[list[str]]:
+    """Pack lines into newline-joined groups no longer than ``limit`` characters."""
+    groups: list[list[str]] = []
+    current: list[str] = []
+    size = 0
+    for line in lines:
+        line = line[:limit]
+        added = len(line) + (1 if current else 0)
+        if current and size + added > limit:
+            groups.append(current)
+            current, size, added = [], 0, len(line)
+        current.append(line)
+        size += added
+    if current:
+        groups.append(current)
+    return groups
+
+
+def time_ago_text(created_at: datetime, now: datetime | None = None) -> str:
+    now = now or datetime.now(UTC)
+    dt = created_at if created_at.tzinfo else created_at.replace(tzinfo=UTC)
+    delta = now - dt
+
+    minutes = int(delta.total_seconds() // 60)
+    if minutes < 1:
+        return "только что"
+    if minutes < 60:
+        return f"{minutes} мин назад"
+
+    hours = minutes // 60
+    if hours < 24:
+        return f"{hours} ч назад"
+
+    days = hours // 24
+    return f"{days} дн назад"
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+@dataclass(frozen=True)
+class LeadCursor:
+    """Position of a lead inside a paginated list: segment index, then ``(created_at, id)``."""
+
+    segment: int
+    created_at: datetime
+    id: int
+
+
+def build_page_callback(view: str, forward: bool, cursor: LeadCursor) -> str:
+    micros = (cursor.created_at - _EPOCH) // timedelta(microseconds=1)
+    return f"leads_page:{view}:{'f' if forward else 'b'}:{cursor.segment}:{micros}:{cursor.id}"
+
+
+def parse_page_callback(data: str | None) -> tuple[str, bool, LeadCursor] | None:
+    parts = (data or "").split(":")
+    if len(parts) != 6 or parts[0] != "leads_page" or parts[2] not in ("f", "b"):
+        return None
+    try:
+        segment, micros, lead_id = int(parts[3]), int(parts[4]), int(parts[5])
+    except ValueError:
+        return None
+    cursor = LeadCursor(segment=segment, created_at=_EPOCH + timedelta(microseconds=micros), id=lead_id)
+    return parts[1], parts[2] == "f", cursor
+
+
+def build_page_range_callback(first: LeadCursor, last: LeadCursor) -> str:
+    first_micros = (first.created_at - _EPOCH) // timedelta(microseconds=1)
+    last_micros = (last.created_at - _EPOCH) // timedelta(microseconds=1)
+    return f"done_all:{first_micros}:{first.id}:{last_micros}:{last.id}"
+
+
+def parse_page_range_callback(data: str | None) -> tuple[LeadCursor, LeadCursor] | None:
+    parts = (data or "").split(":")
+    if len(parts) != 5 or parts[0] != "done_all":
+        return None
+    try:
+        first_micros, first_id, last_micros, last_id = (int(part) for part in parts[1:])
+    except ValueError:
+        return None
+    return (
+        LeadCursor(segment=0, created_at=_EPOCH + timedelta(microseconds=first_micros), id=first_id),
+        LeadCursor(segment=0, created_at=_EPOCH + timedelta(microseconds=last_micros), id=last_id),
+    )
@@ -0,0 +1,48 @@
+class TokenBucket:
+    """Token bucket refilled at ``rate`` tokens per second up to ``capacity``.
+
+    Callers pass a monotonic clock reading so the bucket stays free of I/O.
+    """
+
+    # Flood control keeps one bucket per active user.
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until one token is available (0 if it is available now)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> bool:
+        self._refill(now)
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def reserve(self, now: float) -> float:
+        """Take a token even if it is not there yet; returns the seconds to wait for it."""
+        wait = self.delay(now)
+        self.tokens -= 1
+        return wait
+
+    def pause(self, now: float, seconds: float) -> None:
+        """Drain the bucket so the next token appears only after ``seconds``."""
+        self._refill(now)
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    return min(cap, base * (2 ** max(attempt - 1, 0)))
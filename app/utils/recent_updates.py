@@ -0,0 +1,32 @@
+from heapq import heappop, heappush
+
+
+class RecentUpdateWindow:
+    """Bounded set of recently seen Telegram update ids.
+
+    Update ids only grow, so once the window is full the smallest ids are
+    evicted and the largest evicted id becomes the watermark. Ids at or below
+    the watermark are no longer tracked here and must be checked elsewhere.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.watermark = -1
+        self._ids: set[int] = set()
+        self._heap: list[int] = []
+
+    def __contains__(self, update_id: int) -> bool:
+        return update_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, update_id: int) -> None:
+        if self.capacity <= 0 or update_id <= self.watermark or update_id in self._ids:
+            return
+        self._ids.add(update_id)
+        heappush(self._heap, update_id)
+        while len(self._ids) > self.capacity:
+            oldest = heappop(self._heap)
+            self._ids.discard(oldest)
+            self.watermark = oldest
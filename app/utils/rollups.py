@@ -0,0 +1,47 @@
+from datetime import UTC, datetime
+
+# Sorted, so multi-row upserts always lock rollup rows in the same order.
+ROLLUP_PERIODS = ("day", "hour")
+
+# Upper bounds, in seconds, of the time-to-completion histogram buckets. A
+# duration falls into the bucket whose index is the number of bounds below it,
+# so the last bucket (index ``len(COMPLETION_TIME_BUCKETS)``) has no upper bound.
+COMPLETION_TIME_BUCKETS = (300, 900, 1800, 3600, 7200, 14400, 28800, 86400, 172800, 604800)
+
+
+def bucket_start(at: datetime, period: str) -> datetime:
+    at = (at if at.tzinfo else at.replace(tzinfo=UTC)).astimezone(UTC)
+    if period == "hour":
+        return at.replace(minute=0, second=0, microsecond=0)
+    if period == "day":
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup period: {period}")
+
+
+def median_bucket(counts: dict[int, int]) -> int | None:
+    """Index of the histogram bucket holding the median, or None when empty."""
+    total = sum(counts.values())
+    if total == 0:
+        return None
+    cumulative = 0
+    for bucket in sorted(counts):
+        cumulative += counts[bucket]
+        if cumulative * 2 >= total:
+            return bucket
+    return None
+
+
+def duration_text(seconds: int) -> str:
+    minutes = seconds // 60
+    if minutes < 60:
+        return f"{minutes} мин"
+    hours = minutes // 60
+    if hours < 24:
+        return f"{hours} ч"
+    return f"{hours // 24} дн"
+
+
+def completion_bucket_text(bucket: int) -> str:
+    if bucket >= len(COMPLETION_TIME_BUCKETS):
+        return f"более {duration_text(COMPLETION_TIME_BUCKETS[-1])}"
+    return f"до {duration_text(COMPLETION_TIME_BUCKETS[bucket])}"
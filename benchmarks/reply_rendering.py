@@ -0,0 +1,89 @@
+"""Per-reply serialization cost of keyboards, before and after the pre-serialized markups.
+
+Run from the repository root: ``python benchmarks/reply_rendering.py``.
+No database or network access is needed.
+"""
+
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aiogram import Bot  # noqa: E402
+from aiogram.client.session.aiohttp import AiohttpSession  # noqa: E402
+from aiogram.methods import SendMessage  # noqa: E402
+from aiogram.types import InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup  # noqa: E402
+
+from app.content import ASK_PHONE_TEXT, BTN_CONTACTS, BTN_CREATE_LEAD, BTN_REVIEWS  # noqa: E402
+from app.keyboards.menus import (  # noqa: E402
+    get_admin_lead_keyboard,
+    get_main_menu_keyboard,
+    render_admin_lead_keyboard,
+)
+from app.keyboards.serialized import markup_from_json  # noqa: E402
+from app.services.bot_session import BotSession  # noqa: E402
+
+bot = Bot(token="123456:benchmark")
+plain_session = AiohttpSession()
+cached_session = BotSession()
+PHONE = "+7 (999) 111-22-33"
+
+
+def before_menu_reply() -> None:
+    keyboard = ReplyKeyboardMarkup(
+        keyboard=[
+            [KeyboardButton(text=BTN_CREATE_LEAD)],
+            [KeyboardButton(text=BTN_CONTACTS)],
+            [KeyboardButton(text=BTN_REVIEWS)],
+        ],
+        resize_keyboard=True,
+        is_persistent=True,
+    )
+    plain_session.build_form_data(bot, SendMessage(chat_id=5550001, text=ASK_PHONE_TEXT, reply_markup=keyboard))
+
+
+def after_menu_reply() -> None:
+    method = SendMessage(chat_id=5550001, text=ASK_PHONE_TEXT, reply_markup=get_main_menu_keyboard())
+    cached_session.build_form_data(bot, method)
+
+
+def before_admin_alert() -> None:
+    # Rendered into the outbox row, then parsed and serialized again by the dispatcher.
+    stored = get_admin_lead_keyboard(PHONE, 123456).model_dump_json(exclude_none=True)
+    keyboard = InlineKeyboardMarkup.model_validate_json(stored)
+    plain_session.build_form_data(bot, SendMessage(chat_id=1, text="lead", reply_markup=keyboard))
+
+
+def after_admin_alert() -> None:
+    keyboard = markup_from_json(render_admin_lead_keyboard(PHONE, 123456))
+    cached_session.build_form_data(bot, SendMessage(chat_id=1, text="lead", reply_markup=keyboard))
+
+
+def _allocated(function) -> int:
+    function()
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    number = 20000
+    for label, before, after in (
+        ("menu reply", before_menu_reply, after_menu_reply),
+        ("admin alert", before_admin_alert, after_admin_alert),
+    ):
+        before_us = min(timeit.repeat(before, number=number, repeat=5)) / number * 1e6
+        after_us = min(timeit.repeat(after, number=number, repeat=5)) / number * 1e6
+        print(
+            f"{label:<11} before {before_us:7.2f} us {_allocated(before):6d} B peak   "
+            f"after {after_us:7.2f} us {_allocated(after):6d} B peak   x{before_us / after_us:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Per-update CPU cost of the webhook ingest path, before and after raw-bytes parsing.
+
+Run from the repository root: ``python benchmarks/webhook_ingest.py``.
+No database or network access is needed.
+"""
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from aiogram import Bot  # noqa: E402
+from aiogram.types import Update  # noqa: E402
+
+from app.utils.logic import extract_update_id, extract_update_id_from_body  # noqa: E402
+
+BODY = json.dumps(
+    {
+        "update_id": 912345678,
+        "message": {
+            "message_id": 4321,
+            "from": {"id": 5550001, "is_bot": False, "first_name": "Anna", "username": "anna", "language_code": "ru"},
+            "chat": {"id": 5550001, "first_name": "Anna", "username": "anna", "type": "private"},
+            "date": 1760790000,
+            "text": "Хочу записаться на консультацию в пятницу после обеда",
+        },
+    },
+    ensure_ascii=False,
+).encode()
+
+bot = Bot(token="123456:benchmark")
+
+
+def before_new_update() -> None:
+    payload = json.loads(BODY)
+    extract_update_id(payload)
+    update = Update.model_validate(payload)
+    # Dispatcher.feed_update re-mounts updates that were validated without the bot.
+    Update.model_validate(update.model_dump(), context={"bot": bot})
+
+
+def after_new_update() -> None:
+    extract_update_id_from_body(BODY)
+    Update.model_validate_json(BODY, context={"bot": bot})
+
+
+def before_duplicate() -> None:
+    extract_update_id(json.loads(BODY))
+
+
+def after_duplicate() -> None:
+    extract_update_id_from_body(BODY)
+
+
+def main() -> None:
+    number = 20000
+    for label, before, after in (
+        ("new update", before_new_update, after_new_update),
+        ("duplicate", before_duplicate, after_duplicate),
+    ):
+        before_us = min(timeit.repeat(before, number=number, repeat=5)) / number * 1e6
+        after_us = min(timeit.repeat(after, number=number, repeat=5)) / number * 1e6
+        print(f"{label:<11} before {before_us:8.2f} us   after {after_us:8.2f} us   x{before_us / after_us:.1f}")
+
+
+if __name__ == "__main__":
+    main()
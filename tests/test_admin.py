@@ -0,0 +1,58 @@
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from app.handlers.admin import _mark_completed_buttons, _mark_completed_text
+
+ALL_PAGE = (
+    "Последние заявки:\n\n"
+    "1. #7 Anna +7999 (5 ч назад) [STALE]\n   Service: Стрижка\n   Статус: Новая\n\n"
+    "2. #8 Igor +7888 (1 мин назад)\n   Service: Не указана\n   Статус: Новая\n"
+)
+NEW_PAGE = (
+    "Новые заявки (2):\n\n"
+    "1. #7 Anna +7999 (5 ч назад) [STALE]\n   Service: Стрижка\n\n"
+    "2. #8 Igor +7888 (1 мин назад)\n   Service: Не указана"
+)
+
+
+def test_mark_completed_text_updates_status_lines() -> None:
+    assert _mark_completed_text(ALL_PAGE, {7}) == (
+        "Последние заявки:\n\n"
+        "1. #7 Anna +7999 (5 ч назад)\n   Service: Стрижка\n   Статус: Завершена\n\n"
+        "2. #8 Igor +7888 (1 мин назад)\n   Service: Не указана\n   Статус: Новая\n"
+    )
+
+
+def test_mark_completed_text_adds_status_to_new_leads_page() -> None:
+    assert _mark_completed_text(NEW_PAGE, {7, 8}) == (
+        "Новые заявки (2):\n\n"
+        "1. #7 Anna +7999 (5 ч назад)\n   Service: Стрижка\n   Статус: Завершена\n\n"
+        "2. #8 Igor +7888 (1 мин назад)\n   Service: Не указана\n   Статус: Завершена"
+    )
+
+
+def test_mark_completed_buttons_drops_done_buttons() -> None:
+    markup = InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text="Done #7", callback_data="lead_done:7")],
+            [InlineKeyboardButton(text="Done #8", callback_data="lead_done:8")],
+            [InlineKeyboardButton(text="Done: all shown", callback_data="done_all:x")],
+            [InlineKeyboardButton(text="Далее »", callback_data="leads_page:new:f:x")],
+        ]
+    )
+
+    partial = _mark_completed_buttons(markup, {7}, drop_bulk=False)
+    assert [row[0].callback_data for row in partial.inline_keyboard] == [
+        "lead_done:8",
+        "done_all:x",
+        "leads_page:new:f:x",
+    ]
+    done = _mark_completed_buttons(partial, {8}, drop_bulk=False)
+    assert [row[0].callback_data for row in done.inline_keyboard] == ["leads_page:new:f:x"]
+
+    alert = InlineKeyboardMarkup(
+        inline_keyboard=[
+            [InlineKeyboardButton(text="Call", url="https://wa.me/7999")],
+            [InlineKeyboardButton(text="Done", callback_data="lead_done:7")],
+        ]
+    )
+    assert [row[0].text for row in _mark_completed_buttons(alert, {7}, drop_bulk=False).inline_keyboard] == ["Call"]
@@ -1,9 +1,24 @@
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
 import pytest
 
-from app.config import _parse_admin_id, _require_env
-from app.utils.logic import extract_update_id, normalize_phone, parse_lead_id_from_callback
+from app.config import _env_float_map, _env_int, _env_rate_limits, _parse_admin_id, _require_env, load_pool_settings
+from app.utils.logic import (
+    LeadCursor,
+    build_page_callback,
+    build_page_range_callback,
+    escape_like,
+    extract_update_id,
+    extract_update_id_from_body,
+    group_lines,
+    normalize_phone,
+    parse_lead_id_from_callback,
+    parse_page_callback,
+    parse_page_range_callback,
+    phone_search_key,
+    time_ago_text,
+)
 
 
 def test_parse_admin_id_success() -> None:
@@ -51,3 +66,103 @@ def test_migration_for_processed_updates_exists() -> None:
     assert migration.exists()
     text = migration.read_text(encoding="utf-8")
     assert "processed_updates" in text
+
+
+def test_env_int_uses_default_and_validates(monkeypatch) -> None:
+    monkeypatch.delenv("INT_KEY", raising=False)
+    assert _env_int("INT_KEY", 7) == 7
+    monkeypatch.setenv("INT_KEY", "12")
+    assert _env_int("INT_KEY", 7) == 12
+    monkeypatch.setenv("INT_KEY", "x")
+    with pytest.raises(RuntimeError, match="INT_KEY must be an integer"):
+        _env_int("INT_KEY", 7)
+
+
+def test_group_lines_respects_limit() -> None:
+    groups = group_lines(["aaaa", "bbbb", "cc", "dddddddd"], limit=9)
+    assert groups == [["aaaa", "bbbb"], ["cc"], ["dddddddd"]]
+    assert all(len("\n".join(group)) <= 9 for group in groups)
+
+
+def test_group_lines_truncates_oversized_line() -> None:
+    assert group_lines(["x" * 20], limit=5) == [["xxxxx"]]
+
+
+def test_time_ago_text() -> None:
+    now = datetime(2026, 1, 2, 12, 0, tzinfo=UTC)
+    assert time_ago_text(now, now=now) == "только что"
+    assert time_ago_text(now - timedelta(minutes=5), now=now) == "5 мин назад"
+    assert time_ago_text(now - timedelta(hours=3), now=now) == "3 ч назад"
+    assert time_ago_text(datetime(2025, 12, 30, 12, 0), now=now) == "3 дн назад"
+
+
+def test_page_callback_round_trip_fits_telegram_limit() -> None:
+    cursor = LeadCursor(segment=1, created_at=datetime(2026, 10, 18, 12, 30, 1, 123456, tzinfo=UTC), id=987654321)
+    data = build_page_callback("all", False, cursor)
+
+    assert len(data.encode()) <= 64
+    assert parse_page_callback(data) == ("all", False, cursor)
+
+
+def test_parse_page_callback_rejects_garbage() -> None:
+    assert parse_page_callback(None) is None
+    assert parse_page_callback("leads_page:all:x:0:1:2") is None
+    assert parse_page_callback("leads_page:all:f:0:abc:2") is None
+
+
+def test_page_range_callback_round_trip_fits_telegram_limit() -> None:
+    first = LeadCursor(segment=0, created_at=datetime(2026, 10, 1, 8, 0, 0, 1, tzinfo=UTC), id=999999999)
+    last = LeadCursor(segment=0, created_at=datetime(2026, 10, 18, 23, 59, 59, 999999, tzinfo=UTC), id=999999999)
+    data = build_page_range_callback(first, last)
+
+    assert len(data.encode()) <= 64
+    assert parse_page_range_callback(data) == (first, last)
+    assert parse_page_range_callback("done_all:1:2:3") is None
+
+
+def test_phone_search_key_only_accepts_phone_like_queries() -> None:
+    assert phone_search_key("8 (999) 111-22-33") == "+89991112233"
+    assert phone_search_key("+7 999") is None
+    assert phone_search_key("Anna") is None
+
+
+def test_escape_like() -> None:
+    assert escape_like("50%_off\\") == "50\\%\\_off\\\\"
+
+
+def test_load_pool_settings_caps_warmup_at_pool_size(monkeypatch) -> None:
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_POOL_WARMUP", "10")
+    monkeypatch.setenv("DB_PGBOUNCER", "yes")
+
+    pool = load_pool_settings()
+
+    assert pool.size == 3
+    assert pool.warmup == 3
+    assert pool.pgbouncer is True
+
+
+def test_env_float_map_parses_method_timeouts(monkeypatch) -> None:
+    monkeypatch.setenv("BOT_API_METHOD_TIMEOUTS", " sendMessage=10, getMe=2.5 ,")
+    assert _env_float_map("BOT_API_METHOD_TIMEOUTS") == {"sendMessage": 10.0, "getMe": 2.5}
+
+    monkeypatch.setenv("BOT_API_METHOD_TIMEOUTS", "sendMessage")
+    with pytest.raises(RuntimeError, match="key=number pairs"):
+        _env_float_map("BOT_API_METHOD_TIMEOUTS")
+
+
+def test_env_rate_limits_parses_groups(monkeypatch) -> None:
+    monkeypatch.setenv("FLOOD_LIMITS", "default=3:10, Start=0.2:2")
+    assert _env_rate_limits("FLOOD_LIMITS", "") == {"default": (3.0, 10.0), "start": (0.2, 2.0)}
+
+    monkeypatch.setenv("FLOOD_LIMITS", "default=0:10")
+    with pytest.raises(RuntimeError, match="positive rate"):
+        _env_rate_limits("FLOOD_LIMITS", "")
+
+
+def test_extract_update_id_from_body_reads_leading_key_only() -> None:
+    assert extract_update_id_from_body(b'{"update_id":123,"message":{}}') == 123
+    assert extract_update_id_from_body(b' { "update_id" : 7 }') == 7
+    assert extract_update_id_from_body(b'{"message":{"text":"\\"update_id\\":1"},"update_id":5}') is None
+    assert extract_update_id_from_body(b'{"update_id":12abc}') is None
+    assert extract_update_id_from_body(b"") is None
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from aiogram import Bot
+from aiogram.exceptions import TelegramServerError
+from aiohttp import web
+
+from app.config import BotApiSettings
+from app.services.bot_session import BOT_API_RETRIES, build_bot_session
+
+
+async def _with_stand_in_server(failures: int, calls: list[str], scenario) -> None:
+    """Run ``scenario(bot)`` against a local Bot API stand-in that fails the first calls with 502."""
+
+    async def handle(request: web.Request) -> web.Response:
+        calls.append(request.match_info["method"])
+        if len(calls) <= failures:
+            return web.json_response({"ok": False, "error_code": 502, "description": "Bad Gateway"}, status=502)
+        if request.match_info["method"] == "getMe":
+            return web.json_response(
+                {"ok": True, "result": {"id": 42, "is_bot": True, "first_name": "Stand-in", "username": "stand_in_bot"}}
+            )
+        return web.json_response({"ok": True, "result": True})
+
+    app = web.Application()
+    app.router.add_post("/bot{token}/{method}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    session = build_bot_session(
+        BotApiSettings(base_url=f"http://127.0.0.1:{port}/", retries=2, retry_backoff=0.001)
+    )
+    try:
+        await scenario(Bot(token="42:TEST", session=session))
+    finally:
+        await session.close()
+        await runner.cleanup()
+
+
+def test_idempotent_calls_are_retried_against_the_configured_base_url() -> None:
+    calls: list[str] = []
+
+    async def scenario(bot: Bot) -> None:
+        me = await bot.get_me()
+        assert me.username == "stand_in_bot"
+
+    asyncio.run(_with_stand_in_server(2, calls, scenario))
+
+    assert calls == ["getMe", "getMe", "getMe"]
+    assert BOT_API_RETRIES.labels("getMe").value >= 2
+
+
+def test_sends_are_not_retried() -> None:
+    calls: list[str] = []
+
+    async def scenario(bot: Bot) -> None:
+        with pytest.raises(TelegramServerError):
+            await bot.send_message(chat_id=1, text="hi")
+
+    asyncio.run(_with_stand_in_server(1, calls, scenario))
+
+    assert calls == ["sendMessage"]
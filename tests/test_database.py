@@ -0,0 +1,20 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.database import DB_QUERY_LATENCY, instrument_queries
+
+
+def test_instrument_queries_survives_failed_statements() -> None:
+    engine = create_engine("sqlite://")
+    instrument_queries(engine, "test")
+    latency = DB_QUERY_LATENCY.labels("test", "select")
+    before = latency.count
+
+    with engine.connect() as conn:
+        with pytest.raises(OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+        assert "query_started" not in conn.info
+
+    assert latency.count == before + 1
@@ -0,0 +1,22 @@
+from app.utils.deadlines import DeadlineHeap
+
+
+def test_deadline_heap_pops_due_keys_in_order() -> None:
+    deadlines = DeadlineHeap()
+    deadlines.schedule(1, 30.0)
+    deadlines.schedule(2, 10.0)
+    deadlines.schedule(3, 20.0)
+    assert deadlines.next_deadline() == 10.0
+    assert deadlines.pop_due(25.0) == [2, 3]
+    assert deadlines.next_deadline() == 30.0
+
+
+def test_deadline_heap_reschedule_and_cancel() -> None:
+    deadlines = DeadlineHeap()
+    deadlines.schedule(1, 10.0)
+    deadlines.schedule(1, 50.0)
+    deadlines.schedule(2, 20.0)
+    deadlines.cancel(2)
+    assert deadlines.next_deadline() == 50.0
+    assert deadlines.pop_due(40.0) == []
+    assert len(deadlines) == 1
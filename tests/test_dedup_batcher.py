@@ -0,0 +1,63 @@
+import asyncio
+
+from app.services import dedup
+from app.services.dedup import ProcessedUpdateBatcher
+
+
+def test_batcher_flushes_concurrent_ids_in_one_insert(monkeypatch) -> None:
+    calls: list[set[int]] = []
+    stored = {2}
+
+    async def fake_insert(update_ids) -> set[int]:
+        batch = set(update_ids)
+        calls.append(batch)
+        inserted = batch - stored
+        stored.update(inserted)
+        return inserted
+
+    monkeypatch.setattr(dedup, "_insert_update_ids", fake_insert)
+
+    async def scenario() -> list[bool]:
+        batcher = ProcessedUpdateBatcher(max_size=100, max_delay=0.01)
+        return await asyncio.gather(*(batcher.submit(update_id) for update_id in (1, 2, 3, 1)))
+
+    assert asyncio.run(scenario()) == [True, False, True, False]
+    assert calls == [{1, 2, 3}]
+
+
+def test_batcher_flushes_when_full(monkeypatch) -> None:
+    calls: list[set[int]] = []
+
+    async def fake_insert(update_ids) -> set[int]:
+        calls.append(set(update_ids))
+        return set(update_ids)
+
+    monkeypatch.setattr(dedup, "_insert_update_ids", fake_insert)
+
+    async def scenario() -> list[bool]:
+        batcher = ProcessedUpdateBatcher(max_size=2, max_delay=10)
+        return await asyncio.gather(*(batcher.submit(update_id) for update_id in (1, 2, 3, 4)))
+
+    assert asyncio.run(scenario()) == [True, True, True, True]
+    assert calls == [{1, 2}, {3, 4}]
+
+
+def test_batcher_drain_writes_the_pending_batch(monkeypatch) -> None:
+    calls: list[set[int]] = []
+
+    async def fake_insert(update_ids) -> set[int]:
+        await asyncio.sleep(0)
+        calls.append(set(update_ids))
+        return set(update_ids)
+
+    monkeypatch.setattr(dedup, "_insert_update_ids", fake_insert)
+
+    async def scenario() -> list[bool]:
+        batcher = ProcessedUpdateBatcher(max_size=100, max_delay=3600)
+        submitted = [asyncio.create_task(batcher.submit(update_id)) for update_id in (1, 2)]
+        await asyncio.sleep(0)
+        await batcher.drain()
+        assert calls == [{1, 2}]
+        return await asyncio.gather(*submitted)
+
+    assert asyncio.run(scenario()) == [True, True]
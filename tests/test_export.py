@@ -0,0 +1,92 @@
+import asyncio
+import json
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+from aiogram.filters import CommandObject
+
+from app.config import settings
+from app.handlers import admin
+from app.services.export import LeadExport
+from app.utils.export import (
+    EXPORT_FIELDS,
+    ExportFilters,
+    encode_csv_rows,
+    encode_ndjson_rows,
+    parse_export_args,
+)
+
+ROW = (7, datetime(2026, 10, 18, 9, 30, tzinfo=UTC), "new", 'Anna "A"', "+7999", "+7999", None, "a,b", 42, None)
+
+
+def test_encode_csv_rows_quotes_and_header() -> None:
+    assert encode_csv_rows([], header=True).decode().strip() == ",".join(EXPORT_FIELDS)
+    line = encode_csv_rows([ROW]).decode()
+    assert line == '7,2026-10-18T09:30:00+00:00,new,"Anna ""A""",\'+7999,\'+7999,,"a,b",42,\r\n'
+
+
+def test_encode_csv_rows_neutralizes_formulas() -> None:
+    row = (7, None, "new", "=HYPERLINK(\"x\")", "-1", None, "@SUM(A1)", "ok", 42, None)
+    line = encode_csv_rows([row]).decode()
+    assert line == '7,,new,"\'=HYPERLINK(""x"")",\'-1,,\'@SUM(A1),ok,42,\r\n'
+
+
+def test_encode_ndjson_rows_one_object_per_line() -> None:
+    lines = encode_ndjson_rows([ROW, ROW]).decode().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])["created_at"] == "2026-10-18T09:30:00+00:00"
+    assert json.loads(lines[0])["service"] is None
+
+
+def test_parse_export_args() -> None:
+    assert parse_export_args(None) == ("csv", ExportFilters())
+    assert parse_export_args("ndjson new from=2026-10-01 to=2026-10-02 cursor=crm") == (
+        "ndjson",
+        ExportFilters(
+            status="new",
+            created_from=datetime(2026, 10, 1, tzinfo=UTC),
+            created_to=datetime(2026, 10, 3, tzinfo=UTC),
+            cursor="crm",
+        ),
+    )
+    assert parse_export_args("from=yesterday") is None
+    assert parse_export_args("cursor=../etc") is None
+    assert parse_export_args("xml") is None
+
+
+class _RecordingMessage:
+    def __init__(self) -> None:
+        self.from_user = SimpleNamespace(id=settings.admin_id)
+        self.texts: list[str] = []
+        self.documents: list = []
+
+    async def answer(self, text: str, **kwargs) -> None:
+        self.texts.append(text)
+
+    async def answer_document(self, document, **kwargs) -> None:
+        self.documents.append(document)
+
+
+def test_cmd_export_answers_with_text_when_nothing_matches(monkeypatch) -> None:
+    committed: list[LeadExport] = []
+
+    async def has_rows(self) -> bool:
+        return False
+
+    async def commit_cursor(self) -> None:
+        committed.append(self)
+
+    monkeypatch.setattr(LeadExport, "has_rows", has_rows)
+    monkeypatch.setattr(LeadExport, "commit_cursor", commit_cursor)
+    message = _RecordingMessage()
+
+    asyncio.run(admin.cmd_export(message, CommandObject(prefix="/", command="export", args="ndjson cursor=crm")))
+
+    assert message.documents == []
+    assert message.texts == ["Нет новых заявок для выгрузки."]
+    assert committed == []
+
+
+def test_full_exports_include_archived_leads() -> None:
+    full = asyncio.run(LeadExport("csv", ExportFilters(status="completed"))._statement(None))
+    assert [select.get_final_froms()[0].name for select in full.selects] == ["leads", "leads_archive"]
@@ -0,0 +1,89 @@
+import asyncio
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+from app.middlewares.flood import FLOOD_THROTTLED, FloodControlMiddleware, flood_group, setup_flood_control
+
+
+def _message(text: str) -> Message:
+    return Message(message_id=1, date=0, chat=Chat(id=1, type="private"), text=text)
+
+
+async def _handler(event, data):
+    return "handled"
+
+
+def _feed(middleware: FloodControlMiddleware, event, user_id: int, times: int) -> list:
+    data = {"event_from_user": User(id=user_id, is_bot=False, first_name="U")}
+
+    async def run() -> list:
+        return [await middleware(_handler, event, data) for _ in range(times)]
+
+    return asyncio.run(run())
+
+
+def test_flood_group_resolves_commands_and_callbacks() -> None:
+    user = User(id=1, is_bot=False, first_name="U")
+    assert flood_group(_message("/start@lead_bot payload")) == "start"
+    assert flood_group(_message("Контакты")) == "text"
+    assert flood_group(_message("/")) == "text"
+    assert flood_group(CallbackQuery(id="1", from_user=user, chat_instance="c", data="lead_done:1")) == "callback"
+
+
+def test_excess_updates_are_dropped_per_user_and_group() -> None:
+    middleware = FloodControlMiddleware({"default": (0.001, 2), "start": (0.001, 1)}, exempt_user_ids=(99,))
+    dropped_before = FLOOD_THROTTLED.labels("default", "dropped").value
+
+    assert _feed(middleware, _message("hi"), user_id=1, times=3) == ["handled", "handled", None]
+    # /start has its own bucket; other commands share the default one.
+    assert _feed(middleware, _message("/start"), user_id=1, times=2) == ["handled", None]
+    assert _feed(middleware, _message("/help"), user_id=1, times=1) == [None]
+    assert _feed(middleware, _message("hi"), user_id=2, times=1) == ["handled"]
+    assert _feed(middleware, _message("hi"), user_id=99, times=5) == ["handled"] * 5
+
+    assert FLOOD_THROTTLED.labels("default", "dropped").value - dropped_before == 2
+    assert FLOOD_THROTTLED.labels("start", "dropped").value >= 1
+
+
+def test_delay_mode_holds_updates_within_the_limit() -> None:
+    middleware = FloodControlMiddleware({"default": (50, 1)}, action="delay", max_delay=0.05)
+
+    assert _feed(middleware, _message("hi"), user_id=1, times=3) == ["handled", "handled", "handled"]
+    assert FLOOD_THROTTLED.labels("default", "delayed").value >= 2
+
+
+def test_throttled_updates_never_read_fsm_state() -> None:
+    class CountingStorage(MemoryStorage):
+        reads = 0
+
+        async def get_state(self, key):
+            CountingStorage.reads += 1
+            return await super().get_state(key)
+
+    dispatcher = Dispatcher(storage=CountingStorage(), disable_fsm=True)
+    setup_flood_control(dispatcher, FloodControlMiddleware({"default": (0.001, 1)}))
+    router = Router()
+
+    @router.message()
+    async def echo(message: Message, raw_state: str | None) -> str:
+        return "handled"
+
+    dispatcher.include_router(router)
+    bot = Bot(token="42:TEST")
+    user = User(id=1, is_bot=False, first_name="U")
+
+    async def feed() -> list:
+        results = []
+        for update_id in range(3):
+            message = Message(message_id=update_id, date=0, chat=Chat(id=1, type="private"), from_user=user, text="hi")
+            update = Update(update_id=update_id, message=message)
+            results.append(await dispatcher.feed_update(bot, update))
+        return results
+
+    results = asyncio.run(feed())
+
+    assert results[0] == "handled"
+    assert results[1:] == [None, None]
+    assert CountingStorage.reads == 1
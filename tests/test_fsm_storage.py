@@ -0,0 +1,128 @@
+import asyncio
+from types import SimpleNamespace
+
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from sqlalchemy.dialects import postgresql
+
+from app.services import fsm_storage
+from app.services.fsm_storage import PostgresStorage, clear_form, update_form
+
+
+class _Form(StatesGroup):
+    first = State()
+    second = State()
+
+
+def test_update_form_and_clear_form_with_memory_storage() -> None:
+    async def scenario() -> tuple:
+        state = FSMContext(storage=MemoryStorage(), key=StorageKey(bot_id=1, chat_id=2, user_id=2))
+        await update_form(state, _Form.first, name="Anna")
+        await update_form(state, _Form.second, phone="+7999")
+        moved = (await state.get_state(), await state.get_data())
+        await clear_form(state)
+        return moved, (await state.get_state(), await state.get_data())
+
+    moved, cleared = asyncio.run(scenario())
+    assert moved == (_Form.second.state, {"name": "Anna", "phone": "+7999"})
+    assert cleared == (None, {})
+
+
+class _StubSession:
+    """Session stand-in that returns queued rows and records the statements it ran."""
+
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+        self.statements: list = []
+
+    def __call__(self) -> "_StubSession":
+        return self
+
+    def begin(self) -> "_StubSession":
+        return self
+
+    async def __aenter__(self) -> "_StubSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    async def execute(self, statement) -> SimpleNamespace:
+        self.statements.append(statement.compile(dialect=postgresql.dialect()))
+        row = self.rows.pop(0)
+        return SimpleNamespace(first=lambda: row)
+
+
+def _row(version: int, state: str | None, data: dict | None) -> SimpleNamespace:
+    return SimpleNamespace(version=version, state=state, data=data)
+
+
+KEY = StorageKey(bot_id=1, chat_id=2, user_id=2)
+
+
+def test_postgres_storage_serves_cache_then_revalidates(monkeypatch) -> None:
+    session = _StubSession([_row(1, "_Form:first", {"name": "Anna"}), _row(1, None, None)])
+    monkeypatch.setattr(fsm_storage, "AsyncSessionLocal", session)
+    storage = PostgresStorage(cache_ttl=60)
+
+    async def scenario() -> tuple:
+        first = await storage.get_data(KEY)
+        cached = await storage.get_state(KEY)
+        revalidated = await storage._load(KEY, revalidate=True)
+        return first, cached, revalidated
+
+    first, cached, revalidated = asyncio.run(scenario())
+
+    assert first == {"name": "Anna"}
+    assert cached == "_Form:first"
+    assert (revalidated.state, revalidated.data, revalidated.version) == ("_Form:first", {"name": "Anna"}, 1)
+    assert len(session.statements) == 2
+    # The revalidation only ships the payload when the version moved on.
+    assert "CASE WHEN (fsm_states.version = " in str(session.statements[1])
+
+
+def test_update_form_retries_when_another_worker_wrote_first(monkeypatch) -> None:
+    session = _StubSession(
+        [
+            _row(1, "_Form:first", {"name": "Anna"}),  # initial read
+            None,  # conditional write loses: version 1 is stale
+            _row(2, "_Form:first", {"name": "Anna", "comment": "other worker"}),  # revalidation
+            _row(3, "_Form:second", {"name": "Anna", "comment": "other worker", "phone": "+7999"}),
+        ]
+    )
+    monkeypatch.setattr(fsm_storage, "AsyncSessionLocal", session)
+    storage = PostgresStorage(cache_ttl=60)
+    state = FSMContext(storage=storage, key=KEY)
+
+    asyncio.run(update_form(state, _Form.second, phone="+7999"))
+
+    first_write, retry = session.statements[1], session.statements[3]
+    assert "WHERE fsm_states.version = %(version_1)s" in str(first_write)
+    assert first_write.params["version_1"] == 1
+    assert retry.params["version_1"] == 2
+    assert retry.params["data"] == {"name": "Anna", "comment": "other worker", "phone": "+7999"}
+    assert asyncio.run(storage.get_state(KEY)) == _Form.second.state
+
+
+def test_clear_form_revalidates_before_skipping_the_write(monkeypatch) -> None:
+    session = _StubSession(
+        [
+            None,  # initial read: no form
+            _row(4, "_Form:first", {"name": "Anna"}),  # another worker started a form meanwhile
+            _row(5, None, {}),
+        ]
+    )
+    monkeypatch.setattr(fsm_storage, "AsyncSessionLocal", session)
+    storage = PostgresStorage(cache_ttl=60)
+    state = FSMContext(storage=storage, key=KEY)
+
+    async def scenario() -> None:
+        await state.get_state()
+        await clear_form(state)
+
+    asyncio.run(scenario())
+
+    assert len(session.statements) == 3
+    assert session.statements[2].params["version_1"] == 4
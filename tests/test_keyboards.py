@@ -0,0 +1,38 @@
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.methods import SendMessage
+
+from app.keyboards.menus import get_admin_lead_keyboard, get_main_menu_keyboard, render_admin_lead_keyboard
+from app.keyboards.serialized import markup_from_json, serialized_markup
+from app.services.bot_session import BotSession
+
+
+def _form_fields(session: AiohttpSession, bot: Bot, method: SendMessage) -> dict[str, str]:
+    return {options["name"]: value for options, _, value in session.build_form_data(bot, method)._fields}
+
+
+def test_static_keyboards_are_built_and_serialized_once() -> None:
+    assert get_main_menu_keyboard() is get_main_menu_keyboard()
+    assert serialized_markup(get_main_menu_keyboard()) == get_main_menu_keyboard().model_dump_json(exclude_none=True)
+    assert serialized_markup(get_admin_lead_keyboard("+79991112233", 1)) is None
+
+
+def test_bot_session_sends_cached_markup_with_the_same_fields() -> None:
+    bot = Bot(token="42:TEST")
+    method = SendMessage(chat_id=7, text="Меню", reply_markup=get_main_menu_keyboard())
+
+    cached = _form_fields(BotSession(), bot, method)
+    plain = _form_fields(AiohttpSession(), bot, method)
+
+    assert cached.keys() == plain.keys()
+    assert cached["reply_markup"] == serialized_markup(get_main_menu_keyboard())
+    assert {key: value for key, value in cached.items() if key != "reply_markup"} == {
+        key: value for key, value in plain.items() if key != "reply_markup"
+    }
+
+
+def test_admin_lead_keyboard_template_matches_model() -> None:
+    for phone in ("+7 (999) 111-22-33", "89991112233"):
+        rendered = render_admin_lead_keyboard(phone, 42)
+        assert rendered == get_admin_lead_keyboard(phone, 42).model_dump_json(exclude_none=True)
+        assert serialized_markup(markup_from_json(rendered)) == rendered
@@ -0,0 +1,178 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services.leader import IS_LEADER, LeaderElection
+
+
+class _StubConnection:
+    def __init__(self, acquired: bool = True, heartbeats: int | None = None) -> None:
+        self.acquired = acquired
+        # Heartbeats that succeed before the connection is "lost"; None never fails.
+        self.heartbeats = heartbeats
+        self.invalidated = False
+        self.listeners = {}
+
+    async def __aenter__(self) -> "_StubConnection":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    async def scalar(self, statement) -> bool:
+        return self.acquired
+
+    async def execute(self, statement) -> None:
+        if self.heartbeats is not None:
+            if self.heartbeats == 0:
+                raise ConnectionError("connection lost")
+            self.heartbeats -= 1
+
+    async def commit(self) -> None:
+        return None
+
+    async def invalidate(self) -> None:
+        self.invalidated = True
+
+    async def get_raw_connection(self) -> SimpleNamespace:
+        return SimpleNamespace(driver_connection=self)
+
+    async def add_listener(self, channel: str, listener) -> None:
+        self.listeners[channel] = listener
+
+
+class _StubEngine:
+    def __init__(self, *connections: _StubConnection) -> None:
+        self.connections = list(connections)
+        self.connects = 0
+
+    def connect(self) -> _StubConnection:
+        connection = self.connections[min(self.connects, len(self.connections) - 1)]
+        self.connects += 1
+        return connection
+
+
+async def _wait_for(condition, timeout: float = 1.0) -> None:
+    async def poll() -> None:
+        while not condition():
+            await asyncio.sleep(0.001)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def _stop(task: asyncio.Task) -> None:
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def test_leader_runs_jobs_only_after_acquiring_the_lock() -> None:
+    async def scenario() -> None:
+        started = []
+
+        async def job() -> None:
+            started.append(IS_LEADER.get())
+            await asyncio.Event().wait()
+
+        contended = _StubConnection(acquired=False)
+        leader = LeaderElection(_StubEngine(contended, _StubConnection()), retry_interval=0.01)
+        leader.add_job("job", job)
+        task = asyncio.create_task(leader.run())
+        await _wait_for(lambda: started)
+        assert started == [1]
+        assert leader.engine.connects == 2
+        assert not contended.invalidated
+        await _stop(task)
+
+    asyncio.run(scenario())
+
+
+def test_leader_invalidates_its_connection_on_exit() -> None:
+    async def scenario() -> None:
+        cancelled = asyncio.Event()
+
+        async def job() -> None:
+            try:
+                await asyncio.Event().wait()
+            finally:
+                cancelled.set()
+
+        connection = _StubConnection()
+        leader = LeaderElection(_StubEngine(connection), retry_interval=0.01)
+        leader.add_job("job", job)
+        task = asyncio.create_task(leader.run())
+        await _wait_for(lambda: IS_LEADER.get() == 1)
+        await _stop(task)
+
+        assert connection.invalidated
+        assert cancelled.is_set()
+        assert IS_LEADER.get() == 0
+
+    asyncio.run(scenario())
+
+
+def test_leader_steps_down_and_is_reelected_after_losing_its_connection() -> None:
+    async def scenario() -> None:
+        runs = []
+        cancelled = []
+
+        async def job() -> None:
+            runs.append(len(runs))
+            try:
+                await asyncio.Event().wait()
+            finally:
+                cancelled.append(len(runs))
+
+        lost = _StubConnection(heartbeats=1)
+        leader = LeaderElection(_StubEngine(lost, _StubConnection()), retry_interval=0.01)
+        leader.add_job("job", job)
+        task = asyncio.create_task(leader.run())
+        await _wait_for(lambda: len(runs) == 2)
+
+        assert lost.invalidated
+        assert cancelled == [1]
+        assert IS_LEADER.get() == 1
+        await _stop(task)
+
+    asyncio.run(scenario())
+
+
+def test_leader_restarts_crashed_jobs_but_not_finished_ones() -> None:
+    async def scenario() -> None:
+        calls = {"flaky": 0, "once": 0}
+
+        async def flaky() -> None:
+            calls["flaky"] += 1
+            if calls["flaky"] < 3:
+                raise RuntimeError("boom")
+            await asyncio.Event().wait()
+
+        async def once() -> None:
+            calls["once"] += 1
+
+        leader = LeaderElection(_StubEngine(_StubConnection()), retry_interval=0.01)
+        leader.add_job("flaky", flaky)
+        leader.add_job("once", once)
+        task = asyncio.create_task(leader.run())
+        await _wait_for(lambda: calls["flaky"] == 3)
+        await asyncio.sleep(0.05)
+
+        assert calls == {"flaky": 3, "once": 1}
+        await _stop(task)
+
+    asyncio.run(scenario())
+
+
+def test_leader_forwards_notifications_to_listeners() -> None:
+    async def scenario() -> None:
+        payloads = []
+        connection = _StubConnection()
+        leader = LeaderElection(_StubEngine(connection), retry_interval=0.01)
+        leader.add_listener("channel", payloads.append)
+        task = asyncio.create_task(leader.run())
+        await _wait_for(lambda: IS_LEADER.get() == 1)
+
+        connection.listeners["channel"](connection, 1, "channel", "payload")
+
+        assert payloads == ["payload"]
+        await _stop(task)
+
+    asyncio.run(scenario())
@@ -0,0 +1,18 @@
+from app.utils.lru import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache: LRUCache[int, str] = LRUCache(capacity=2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"
+    cache.put(3, "c")
+    assert 2 not in cache
+    assert cache.get(1) == "a"
+    assert cache.get(3) == "c"
+
+
+def test_lru_cache_with_zero_capacity_stores_nothing() -> None:
+    cache: LRUCache[int, str] = LRUCache(capacity=0)
+    cache.put(1, "a")
+    assert cache.get(1) is None
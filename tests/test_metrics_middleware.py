@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+from aiogram.dispatcher.event.handler import HandlerObject
+from aiogram.methods import SendMessage
+
+from app.middlewares.metrics import (
+    BOT_API_ERRORS,
+    BOT_API_LATENCY,
+    HANDLER_ERRORS,
+    HANDLER_LATENCY,
+    BotApiMetricsMiddleware,
+    HandlerMetricsMiddleware,
+)
+from app.services.metrics import render_metrics
+
+
+async def sample_handler(event, data):
+    return "handled"
+
+
+def test_handler_middleware_times_handler_and_counts_errors() -> None:
+    middleware = HandlerMetricsMiddleware()
+    data = {"handler": HandlerObject(callback=sample_handler)}
+    name = f"{__name__}.sample_handler"
+
+    async def failing(event, data):
+        raise RuntimeError("boom")
+
+    assert asyncio.run(middleware(sample_handler, object(), data)) == "handled"
+    with pytest.raises(RuntimeError):
+        asyncio.run(middleware(failing, object(), data))
+
+    assert HANDLER_LATENCY.labels(name).count == 2
+    assert HANDLER_ERRORS.labels(name).value == 1
+    assert f'bot_handler_seconds_count{{handler="{name}"}} 2' in render_metrics()
+
+
+def test_bot_api_middleware_records_latency_and_errors() -> None:
+    middleware = BotApiMetricsMiddleware()
+    method = SendMessage(chat_id=1, text="hi")
+
+    async def failing(bot, method):
+        raise TimeoutError
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(middleware(failing, None, method))
+
+    assert BOT_API_LATENCY.labels("sendMessage").count >= 1
+    assert BOT_API_ERRORS.labels("sendMessage", "TimeoutError").value == 1
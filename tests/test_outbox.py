@@ -0,0 +1,43 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+from app.services import outbox
+from app.services.outbox import OUTBOX_LAG, OutboxDispatcher
+
+
+class _StubSession:
+    """Session stand-in for a poll that claims nothing while older rows wait out a backoff."""
+
+    def __init__(self, oldest: datetime | None) -> None:
+        self.oldest = oldest
+
+    def begin(self) -> "_StubSession":
+        return self
+
+    async def __aenter__(self) -> "_StubSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    async def execute(self, statement) -> SimpleNamespace:
+        return SimpleNamespace(all=lambda: [])
+
+    async def scalar(self, statement) -> datetime | None:
+        return self.oldest
+
+
+def _dispatcher() -> OutboxDispatcher:
+    return OutboxDispatcher(bot=None, batch_size=10, global_rate=30, per_chat_rate=1, max_attempts=5)
+
+
+def test_lag_counts_pending_rows_that_were_not_claimed(monkeypatch) -> None:
+    monkeypatch.setattr(outbox, "AsyncSessionLocal", _StubSession(datetime.now(UTC) - timedelta(minutes=5)))
+
+    assert asyncio.run(_dispatcher().dispatch_once()) == 0
+    assert 300 <= OUTBOX_LAG.get() < 310
+
+    monkeypatch.setattr(outbox, "AsyncSessionLocal", _StubSession(None))
+    asyncio.run(_dispatcher().dispatch_once())
+    assert OUTBOX_LAG.get() == 0
@@ -0,0 +1,33 @@
+import pytest
+
+from app.utils.rate_limit import TokenBucket, backoff_delay
+
+
+def test_token_bucket_allows_burst_then_waits() -> None:
+    bucket = TokenBucket(rate=2, capacity=2, now=0.0)
+    assert bucket.consume(0.0)
+    assert bucket.consume(0.0)
+    assert not bucket.consume(0.0)
+    assert bucket.delay(0.0) == pytest.approx(0.5)
+    assert bucket.consume(0.5)
+
+
+def test_token_bucket_pause_delays_next_token() -> None:
+    bucket = TokenBucket(rate=1, capacity=5, now=0.0)
+    bucket.pause(0.0, seconds=3)
+    assert bucket.delay(0.0) == pytest.approx(3)
+    assert bucket.delay(3.0) == 0
+
+
+def test_token_bucket_reserve_queues_waiters() -> None:
+    bucket = TokenBucket(rate=1, capacity=1, now=0.0)
+    assert bucket.reserve(0.0) == 0
+    assert bucket.reserve(0.0) == pytest.approx(1)
+    assert bucket.reserve(0.0) == pytest.approx(2)
+    assert bucket.delay(3.0) == 0
+
+
+def test_backoff_delay_grows_and_is_capped() -> None:
+    assert backoff_delay(1, base=2, cap=60) == 2
+    assert backoff_delay(3, base=2, cap=60) == 8
+    assert backoff_delay(10, base=2, cap=60) == 60
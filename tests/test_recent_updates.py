@@ -0,0 +1,20 @@
+from app.utils.recent_updates import RecentUpdateWindow
+
+
+def test_recent_update_window_remembers_ids() -> None:
+    window = RecentUpdateWindow(capacity=3)
+    window.add(10)
+    window.add(11)
+    assert 10 in window
+    assert 12 not in window
+
+
+def test_recent_update_window_evicts_oldest_and_raises_watermark() -> None:
+    window = RecentUpdateWindow(capacity=2)
+    for update_id in (5, 7, 6):
+        window.add(update_id)
+    assert len(window) == 2
+    assert 5 not in window
+    assert window.watermark == 5
+    window.add(4)
+    assert 4 not in window
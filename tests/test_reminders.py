@@ -0,0 +1,158 @@
+import asyncio
+from datetime import UTC, datetime
+
+import pytest
+
+from app.services import reminders
+from app.services.reminders import DUE_RETRY_SECONDS, REMINDER_REPEAT_HOURS, ReminderScheduler
+
+RESYNC_SECONDS = 1800.0
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.wall = 1_700_000_000.0
+        self.mono = 0.0
+
+    def time(self) -> float:
+        return self.wall
+
+    def monotonic(self) -> float:
+        return self.mono
+
+    def advance(self, seconds: float) -> None:
+        self.wall += seconds
+        self.mono += seconds
+
+
+class _Database:
+    """Stands in for the leads table: open lead id -> next reminder time."""
+
+    def __init__(self) -> None:
+        self.deadlines: dict[int, float] = {}
+        self.remind: list[int] = []
+        self.fetches: list[list[int] | None] = []
+        self.reminder_runs = 0
+
+    async def fetch_reminder_deadlines(self, lead_ids: list[int] | None = None) -> list[tuple[int, float]]:
+        self.fetches.append(lead_ids)
+        return [
+            (lead_id, deadline)
+            for lead_id, deadline in self.deadlines.items()
+            if lead_ids is None or lead_id in lead_ids
+        ]
+
+    async def queue_stale_lead_reminders(self) -> list[int]:
+        self.reminder_runs += 1
+        reminded, self.remind = self.remind, []
+        return reminded
+
+
+@pytest.fixture
+def clock(monkeypatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(reminders, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def database(monkeypatch) -> _Database:
+    database = _Database()
+    monkeypatch.setattr(reminders, "fetch_reminder_deadlines", database.fetch_reminder_deadlines)
+    monkeypatch.setattr(reminders, "queue_stale_lead_reminders", database.queue_stale_lead_reminders)
+    return database
+
+
+def _scheduler() -> ReminderScheduler:
+    scheduler = ReminderScheduler(resync_interval=RESYNC_SECONDS)
+    scheduler._running = True
+    return scheduler
+
+
+def _scheduled(scheduler: ReminderScheduler) -> dict[int, float]:
+    return dict(scheduler._deadlines._deadlines)
+
+
+def test_tick_reminds_due_leads_and_sleeps_until_the_next_deadline(clock, database) -> None:
+    database.deadlines = {1: clock.wall - 10, 2: clock.wall + 100}
+    database.remind = [1]
+    scheduler = _scheduler()
+
+    timeout = asyncio.run(scheduler._tick())
+
+    assert database.reminder_runs == 1
+    assert timeout == 100
+    assert _scheduled(scheduler) == {1: clock.wall + REMINDER_REPEAT_HOURS * 3600, 2: clock.wall + 100}
+
+
+def test_new_and_completed_leads_update_the_heap(clock, database) -> None:
+    scheduler = _scheduler()
+    assert asyncio.run(scheduler._tick()) == RESYNC_SECONDS
+
+    created_at = datetime.fromtimestamp(clock.wall - 1800, UTC)
+    scheduler.lead_notified(f"5:{created_at.timestamp()}")
+    assert scheduler._wakeup.is_set()
+    assert asyncio.run(scheduler._tick()) == 1800
+
+    scheduler.lead_completed(5)
+    assert asyncio.run(scheduler._tick()) == RESYNC_SECONDS
+    assert database.reminder_runs == 0
+
+
+def test_leads_are_ignored_while_not_leading(clock) -> None:
+    scheduler = ReminderScheduler(resync_interval=RESYNC_SECONDS)
+
+    scheduler.lead_created(5, datetime.fromtimestamp(clock.wall, UTC))
+
+    assert _scheduled(scheduler) == {}
+
+
+def test_due_leads_without_a_reminder_are_rechecked(clock, database) -> None:
+    scheduler = _scheduler()
+    asyncio.run(scheduler._tick())
+    for lead_id in (1, 2, 3):
+        scheduler._deadlines.schedule(lead_id, clock.wall)
+    # 1 is still open (locked by another process), 2 was reminded by another
+    # process and 3 was completed on another worker.
+    database.deadlines = {1: clock.wall, 2: clock.wall + 7200}
+
+    asyncio.run(scheduler._tick())
+
+    assert database.fetches[-1] == [1, 2, 3]
+    assert _scheduled(scheduler) == {1: clock.wall + DUE_RETRY_SECONDS, 2: clock.wall + 7200}
+
+
+def test_scheduler_resyncs_from_the_database_periodically(clock, database) -> None:
+    scheduler = _scheduler()
+    asyncio.run(scheduler._tick())
+    database.deadlines = {7: clock.wall + 5000}
+
+    clock.advance(RESYNC_SECONDS - 1)
+    assert asyncio.run(scheduler._tick()) == 1
+    assert database.fetches == [None]
+
+    clock.advance(1)
+    assert asyncio.run(scheduler._tick()) == RESYNC_SECONDS
+    assert database.fetches == [None, None]
+    assert _scheduled(scheduler) == {7: clock.wall + 5000 - RESYNC_SECONDS}
+
+
+def test_new_lead_wakes_the_sleeping_scheduler(clock, database) -> None:
+    async def scenario() -> None:
+        scheduler = ReminderScheduler(resync_interval=RESYNC_SECONDS)
+        database.remind = [9]
+        task = asyncio.create_task(scheduler.run())
+        while not database.fetches:
+            await asyncio.sleep(0.001)
+
+        scheduler.lead_created(9, datetime.fromtimestamp(clock.wall - 3600, UTC))
+        await asyncio.wait_for(_reminded(database), timeout=1.0)
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    async def _reminded(database: _Database) -> None:
+        while not database.reminder_runs:
+            await asyncio.sleep(0.001)
+
+    asyncio.run(scenario())
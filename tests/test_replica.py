@@ -0,0 +1,38 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import replica
+from app.services.replica import ReplicaMonitor
+
+
+class _StubEngine:
+    def __init__(self, streaming: bool, lag: float | None) -> None:
+        self.row = SimpleNamespace(streaming=streaming, lag=lag)
+
+    def connect(self) -> "_StubEngine":
+        return self
+
+    async def __aenter__(self) -> "_StubEngine":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    async def execute(self, statement) -> SimpleNamespace:
+        return SimpleNamespace(one=lambda: self.row)
+
+
+@pytest.mark.parametrize(
+    ("streaming", "lag", "healthy"),
+    [(True, 0, True), (True, None, True), (True, 30.0, False), (False, 0, False)],
+)
+def test_replica_is_healthy_only_while_streaming_within_lag(monkeypatch, streaming, lag, healthy) -> None:
+    monkeypatch.setattr(replica, "replica_engine", _StubEngine(streaming, lag))
+    monitor = ReplicaMonitor(max_lag=10.0, interval=5.0)
+    monitor.healthy = True
+
+    asyncio.run(monitor.check())
+
+    assert monitor.healthy is healthy
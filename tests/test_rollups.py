@@ -0,0 +1,31 @@
+from datetime import UTC, datetime, timedelta, timezone
+
+import pytest
+
+from app.utils.rollups import (
+    COMPLETION_TIME_BUCKETS,
+    bucket_start,
+    completion_bucket_text,
+    median_bucket,
+)
+
+
+def test_bucket_start_truncates_in_utc() -> None:
+    at = datetime(2026, 10, 18, 1, 45, 12, tzinfo=timezone(timedelta(hours=3)))
+
+    assert bucket_start(at, "hour") == datetime(2026, 10, 17, 22, 0, tzinfo=UTC)
+    assert bucket_start(at, "day") == datetime(2026, 10, 17, tzinfo=UTC)
+    with pytest.raises(ValueError):
+        bucket_start(at, "week")
+
+
+def test_median_bucket() -> None:
+    assert median_bucket({}) is None
+    assert median_bucket({0: 1, 3: 1, 5: 1}) == 3
+    assert median_bucket({2: 2, 7: 2}) == 2
+
+
+def test_completion_bucket_text() -> None:
+    assert completion_bucket_text(0) == "до 5 мин"
+    assert completion_bucket_text(4) == "до 2 ч"
+    assert completion_bucket_text(len(COMPLETION_TIME_BUCKETS)) == "более 7 дн"
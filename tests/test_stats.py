@@ -0,0 +1,23 @@
+from sqlalchemy.dialects import postgresql
+
+from app.services.stats import build_counters_update
+from app.services.users import build_user_upsert
+
+
+def _compile(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_counters_update_only_touches_given_columns() -> None:
+    sql = _compile(build_counters_update(leads_new=-1, leads_completed=1))
+
+    assert "leads_new=(stats_counters.leads_new + -1)" in sql
+    assert "leads_completed=(stats_counters.leads_completed + 1)" in sql
+    assert "users_count" not in sql
+    assert "WHERE stats_counters.id = 1" in sql
+
+
+def test_user_upsert_reports_inserted_rows() -> None:
+    sql = _compile(build_user_upsert(42, "alice"))
+
+    assert "RETURNING xmax = 0 AS inserted" in sql
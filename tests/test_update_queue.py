@@ -0,0 +1,49 @@
+import asyncio
+
+from aiogram.types import Update
+
+from app.services.update_queue import UpdateQueue, update_chat_key
+
+
+def _message_update(update_id: int, chat_id: int) -> Update:
+    return Update.model_validate(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 0,
+                "chat": {"id": chat_id, "type": "private"},
+                "text": "hi",
+            },
+        }
+    )
+
+
+class _RecordingDispatcher:
+    def __init__(self) -> None:
+        self.seen: list[tuple[int, int]] = []
+
+    async def feed_update(self, bot, update: Update) -> None:
+        await asyncio.sleep(0)
+        self.seen.append((update.message.chat.id, update.update_id))
+
+
+def test_update_chat_key_uses_chat_id() -> None:
+    assert update_chat_key(_message_update(1, 555)) == 555
+
+
+def test_update_queue_keeps_per_chat_order_and_drains() -> None:
+    async def scenario() -> list[tuple[int, int]]:
+        dispatcher = _RecordingDispatcher()
+        queue = UpdateQueue(workers=3, maxsize=30)
+        queue.start(bot=None, dispatcher=dispatcher)
+        for update_id in range(1, 21):
+            await queue.put(_message_update(update_id, chat_id=update_id % 4))
+        await queue.drain(timeout=5)
+        return dispatcher.seen
+
+    seen = asyncio.run(scenario())
+    assert len(seen) == 20
+    for chat_id in range(4):
+        ids = [update_id for chat, update_id in seen if chat == chat_id]
+        assert ids == sorted(ids)
@@ -0,0 +1,38 @@
+import json
+
+from aiogram import Bot
+from aiogram.methods import SendDocument, SendMessage
+from aiogram.types import BufferedInputFile, KeyboardButton, ReplyKeyboardMarkup
+
+from app.keyboards.menus import get_cancel_keyboard
+from app.services.webhook_reply import build_webhook_reply
+
+
+def test_build_webhook_reply_serializes_method_call() -> None:
+    bot = Bot(token="42:TEST")
+    keyboard = ReplyKeyboardMarkup(keyboard=[[KeyboardButton(text="Да")]])
+    method = SendMessage(chat_id=7, text="Как вас зовут?", reply_markup=keyboard)
+
+    body = json.loads(build_webhook_reply(bot, method))
+
+    assert body["method"] == "sendMessage"
+    assert body["chat_id"] == 7
+    assert body["text"] == "Как вас зовут?"
+    assert body["reply_markup"]["keyboard"] == [[{"text": "Да"}]]
+    assert "parse_mode" not in body
+
+
+def test_build_webhook_reply_reuses_serialized_static_keyboard() -> None:
+    bot = Bot(token="42:TEST")
+    method = SendMessage(chat_id=7, text="Как вас зовут?", reply_markup=get_cancel_keyboard())
+
+    body = json.loads(build_webhook_reply(bot, method))
+
+    assert json.loads(body["reply_markup"])["keyboard"] == [[{"text": "Отмена"}]]
+
+
+def test_build_webhook_reply_skips_file_uploads() -> None:
+    bot = Bot(token="42:TEST")
+    method = SendDocument(chat_id=7, document=BufferedInputFile(b"a,b\n", filename="leads.csv"))
+
+    assert build_webhook_reply(bot, method) is None